@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+# lets the benchmarks run from a checkout without installing anything
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from sudoku.exact_cover import ExactCoverSolver
+from sudoku.game import Game
+from sudoku.loader import parse_puzzle
+from sudoku.solver import Solver
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus.txt")
+
+# the timings shown in the table, in seconds
+TIMINGS = ["solve", "solve_exact_cover", "check_board", "valid_placement", "frame_full", "frame_edit", "frame_idle"]
+
+
+# each line of the corpus is an 81 character puzzle, its category and a name
+def load_corpus(path):
+    corpus = []
+    with open(path) as file:
+        for line in file:
+            if line.strip() and not line.startswith("#"):
+                text, category, name = line.split()
+                corpus.append((name, category, parse_puzzle(text)))
+    return corpus
+
+
+# runs function repeat times and returns the fastest and the median time in seconds
+def timed(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times), statistics.median(times)
+
+
+def bench_solver(puzzle, repeat):
+    solver = Solver(puzzle)
+    solved = solver.solve() is not None
+    best, median = timed(lambda: Solver(puzzle).solve(), repeat)
+    exact_cover, _ = timed(lambda: ExactCoverSolver(puzzle).solve(), repeat)
+    return {"solved": solved, "nodes": solver.nodes, "backtracks": solver.backtracks,
+            "propagations": solver.propagations, "max_depth": solver.max_depth, "solve": best, "solve_median": median,
+            "solve_exact_cover": exact_cover}
+
+
+# checking is timed on the solved board, which is the case where every square has
+# to be looked at
+def bench_checker(puzzle, repeat):
+    game = Game(puzzle)
+    game.solve()
+    best, median = timed(game.check_board, repeat)
+    calls = [(r, c, n) for r in range(9) for c in range(9) for n in range(1, 10)]
+
+    def all_placements():
+        for r, c, n in calls:
+            game.valid_placement(r, c, n)
+
+    placement, _ = timed(all_placements, max(1, repeat // 10))
+    return {"check_board": best, "check_board_median": median, "valid_placement": placement / len(calls)}
+
+
+# frames are drawn under SDL's dummy video driver, so no window is needed. Returns
+# None if pygame isn't installed.
+def bench_render(puzzle, repeat):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    try:
+        import pygame as pg
+        from sudoku import gui
+    except ImportError:
+        return None
+    pg.init()
+    pg.font.init()
+    win = pg.display.set_mode((gui.window_width, gui.window_height))
+    grid = gui.Grid(9, 9, gui.grid_width, gui.grid_height, puzzle)
+    renderer = gui.Renderer(win)
+    gui.update_screen(renderer, grid)
+    empty = [(r, c) for r in range(9) for c in range(9) if puzzle[r][c] == 0]
+
+    def full_frame():
+        renderer.invalidate()
+        gui.update_screen(renderer, grid)
+
+    # one square changes between frames, like a player typing a digit
+    def edit_frame():
+        r, c = empty[0]
+        grid.board.set_value(r, c, 0 if grid.board.values[r, c] else 1)
+        gui.update_screen(renderer, grid)
+
+    full, _ = timed(full_frame, repeat)
+    edit, _ = timed(edit_frame, repeat)
+    idle, _ = timed(lambda: gui.update_screen(renderer, grid), repeat)
+    return {"frame_full": full, "frame_edit": edit, "frame_idle": idle}
+
+
+def run(corpus, repeat, render):
+    results = []
+    for name, category, puzzle in corpus:
+        result = {"name": name, "category": category}
+        result.update(bench_solver(puzzle, repeat))
+        result.update(bench_checker(puzzle, repeat))
+        if render:
+            result.update(bench_render(puzzle, repeat) or {})
+        results.append(result)
+    return results
+
+
+def environment():
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def format_seconds(seconds):
+    if seconds is None:
+        return "-"
+    if seconds < 1e-3:
+        return "%.1fus" % (seconds * 1e6)
+    return "%.2fms" % (seconds * 1e3)
+
+
+def print_table(results, previous=None):
+    previous = {result["name"]: result for result in (previous or [])}
+    header = ["puzzle", "category", "nodes", "backtracks", "solve", "exact cover", "check", "placement", "full frame", "edit frame", "idle frame"]
+    widths = [22, 18] + [16] * (len(header) - 2)
+    print("".join("%-*s" % (width, column) for width, column in zip(widths, header)))
+    for result in results:
+        row = [result["name"], result["category"], str(result["nodes"]), str(result["backtracks"])]
+        for metric in TIMINGS:
+            cell = format_seconds(result.get(metric))
+            old = previous.get(result["name"], {}).get(metric)
+            if old and result.get(metric) is not None:
+                cell += " (%.2fx)" % (result[metric] / old)
+            row.append(cell)
+        print("".join("%-*s" % (width, cell) for width, cell in zip(widths, row)))
+
+
+# python benchmarks/run.py --output new.json --compare old.json
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the solver, checker and renderer")
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "results.json"))
+    parser.add_argument("--compare", help="an earlier results file, ratios against it are printed")
+    parser.add_argument("--no-render", action="store_true", help="skip the frame timings")
+    args = parser.parse_args()
+
+    results = run(load_corpus(args.corpus), args.repeat, not args.no_render)
+    previous = None
+    if args.compare:
+        with open(args.compare) as file:
+            previous = json.load(file)["results"]
+    print_table(results, previous)
+    with open(args.output, "w") as file:
+        json.dump({"environment": environment(), "repeat": args.repeat, "results": results}, file, indent=2)
+    print("results written to " + args.output)
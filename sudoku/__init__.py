@@ -0,0 +1,13 @@
+from .actions import Actions, Centre, ClearMarks, Corner
+from .batch import BatchResult, solve_many
+from .board import Board
+from .cache import SolutionCache
+from .canonical import canonical_form
+from .exact_cover import ExactCoverSolver, Shape
+from .game import Game, starting_sudoku
+from .generator import PuzzlePool, grade, make_puzzle
+from .hints import Step, next_step
+from .history import History
+from .loader import load_puzzle, read_puzzles, solve_file
+from .solver import Solver, solve
+from .worker import SolveJob
@@ -0,0 +1,26 @@
+# these describe an edit the user wants to make to a square, perform_action turns
+# them into deltas in the history. They aren't kept once they have been performed
+class Actions:
+    __slots__ = ("cell_loc", "cell_row", "cell_col", "new_value")
+
+    def __init__(self, cell_loc, new_value):
+        self.cell_loc = cell_loc
+        self.cell_row = cell_loc[0]
+        self.cell_col = cell_loc[1]
+        self.new_value = new_value
+
+
+class Centre(Actions):
+    __slots__ = ()
+
+
+class Corner(Actions):
+    __slots__ = ()
+
+
+# removes every corner and centre mark from a square
+class ClearMarks(Actions):
+    __slots__ = ()
+
+    def __init__(self, cell_loc):
+        super().__init__(cell_loc, 0)
@@ -0,0 +1,228 @@
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+from .solver import ALL_DIGITS, BIT_DIGIT, POPCOUNT, UNITS, Solver
+
+# solutions is an (N, 9, 9) uint8 array (all zeros for puzzles with no solution),
+# solved is an (N,) bool array, times holds the seconds spent on each puzzle and
+# stats the solver's counters for each puzzle
+BatchResult = namedtuple("BatchResult", ["solutions", "solved", "times", "stats"])
+
+STATS_DTYPE = np.dtype([
+    ("nodes", np.uint32),
+    ("backtracks", np.uint32),
+    ("propagations", np.uint32),
+    ("max_depth", np.uint8),
+])
+
+# the solver's tables as arrays for looking up whole batches of boards at once
+UNIT_CELLS = np.array(UNITS)
+POPCOUNTS = np.array(POPCOUNT, dtype=np.uint8)
+BIT_DIGITS = np.zeros(ALL_DIGITS + 1, dtype=np.uint8)
+BIT_DIGITS[list(BIT_DIGIT)] = list(BIT_DIGIT.values())
+
+
+# the digits that appear once, and more than once, in each unit of a batch of
+# boards. The boards are laid out cell by cell, viewed as (band, row in band,
+# stack, column in stack, N), so each cell's candidates across the batch sit next
+# to each other in memory. The results are shaped to broadcast against that view.
+def unit_digits(boards):
+    found = []
+    for cells, shape in (([boards[:, :, s, c] for s in range(3) for c in range(3)], (3, 3, 1, 1, -1)),
+                         ([boards[b, r] for b in range(3) for r in range(3)], (1, 1, 3, 3, -1)),
+                         ([boards[:, r, :, c] for r in range(3) for c in range(3)], (3, 1, 3, 1, -1))):
+        once = np.zeros_like(cells[0])
+        twice = np.zeros_like(cells[0])
+        for cell in cells:
+            twice |= once & cell
+            once |= cell
+        found.append((once.reshape(shape), twice.reshape(shape)))
+    return found
+
+
+# one round of naked and hidden singles on an (81, N) array of candidate bitmasks,
+# one column per board. Returns the new candidates and which boards have been
+# found to be impossible. Two cells of a unit being given the same digit isn't
+# caught here, finished boards are checked for that separately.
+def propagate_step(candidates):
+    boards = candidates.reshape(3, 3, 3, 3, -1)
+    # every placed digit is taken out of the cells that can see it
+    single = (boards & (boards - 1)) == 0
+    seen = 0
+    for once, twice in unit_digits(np.where(single, boards, 0)):
+        seen = seen | once
+    boards = np.where(single, boards, boards & ~seen)
+
+    # a digit that fits in only one cell of a unit goes there, and a digit that
+    # fits nowhere means the board can't be solved
+    bad = np.zeros(boards.shape[-1], dtype=bool)
+    for once, twice in unit_digits(boards):
+        bad |= (once != ALL_DIGITS).reshape(-1, boards.shape[-1]).any(axis=0)
+        hits = boards & (once & ~twice)
+        boards = np.where(hits != 0, hits, boards)
+    candidates = boards.reshape(81, -1)
+    bad |= (candidates == 0).any(axis=0)
+    return candidates, bad
+
+
+# whether every unit of each finished board holds every digit
+def valid_boards(candidates):
+    return (np.bitwise_or.reduce(candidates[:, UNIT_CELLS], axis=2) == ALL_DIGITS).all(axis=1)
+
+
+# runs propagate_step on an (N, 81) array of boards until none of them change.
+# Returns the candidates and which boards are still possible.
+def propagate_many(candidates):
+    candidates = np.ascontiguousarray(candidates.T)
+    possible = np.ones(candidates.shape[1], dtype=bool)
+    active = np.arange(candidates.shape[1])
+    while len(active):
+        before = candidates[:, active]
+        after, bad = propagate_step(before)
+        candidates[:, active] = after
+        possible[active[bad]] = False
+        active = active[~bad & (after != before).any(axis=0)]
+    return candidates.T, possible
+
+
+# solves a chunk of puzzles together. Naked and hidden singles are worked out for
+# every board at once with array operations. Boards that still have open cells
+# are split in two on the cell with the fewest candidates, one copy taking its
+# smallest candidate and the other the rest, and the copies go through the next
+# round together with everything else. A puzzle whose copies grow past
+# branch_limit is handed to the solver on its own instead. Times are each
+# puzzle's share of the rounds plus any time the solver spent on it.
+def solve_vectorized(puzzles, branch_limit=64):
+    count = len(puzzles)
+    start = time.perf_counter()
+    values = puzzles.reshape(count, 81).astype(np.intp)
+    given = values != 0
+    boards = np.where(given, 1 << np.clip(values - 1, 0, 8), ALL_DIGITS).astype(np.uint16)
+    # which puzzle each board is a copy of. A puzzle with a digit that isn't 1-9
+    # has no solution, as with the solver, so it gets no board at all
+    origin = np.arange(count)
+    in_range = ((values >= 0) & (values <= 9)).all(axis=1)
+    boards, origin = boards[in_range], origin[in_range]
+
+    solutions = np.zeros((count, 81), dtype=np.uint8)
+    solved = np.zeros(count, dtype=bool)
+    stats = np.zeros(count, dtype=STATS_DTYPE)
+    leftover = np.zeros(count, dtype=bool)
+    depth = 0
+    while len(boards):
+        stats["nodes"] += np.bincount(origin, minlength=count).astype(np.uint32)
+        stats["max_depth"][origin] = depth
+        boards, possible = propagate_many(boards)
+        stats["backtracks"] += np.bincount(origin[~possible], minlength=count).astype(np.uint32)
+        if depth == 0:
+            placed = (POPCOUNTS[boards] == 1).sum(axis=1) - given[origin].sum(axis=1)
+            stats["propagations"][origin] = np.where(possible, placed, 0)
+        boards, origin = boards[possible], origin[possible]
+
+        finished = (POPCOUNTS[boards] == 1).all(axis=1)
+        invalid = finished.copy()
+        invalid[finished] = ~valid_boards(boards[finished])
+        stats["backtracks"] += np.bincount(origin[invalid], minlength=count).astype(np.uint32)
+        boards, origin, finished = boards[~invalid], origin[~invalid], finished[~invalid]
+        # the first solution found for a puzzle is kept, the rest of its copies are dropped
+        first = np.unique(origin[finished], return_index=True)
+        done = first[0][~solved[first[0]]]
+        solutions[done] = BIT_DIGITS[boards[finished][first[1]][~solved[first[0]]]]
+        solved[done] = True
+        keep = ~finished & ~solved[origin]
+        boards, origin = boards[keep], origin[keep]
+
+        crowded = np.bincount(origin, minlength=count) * 2 > branch_limit
+        leftover |= crowded
+        keep = ~crowded[origin]
+        boards, origin = boards[keep], origin[keep]
+        if not len(boards):
+            break
+
+        counts = POPCOUNTS[boards].astype(np.intp)
+        cell = np.where(counts > 1, counts, 10).argmin(axis=1)
+        rows = np.arange(len(boards))
+        mask = boards[rows, cell]
+        lowest = mask & (~mask + 1)
+        guessed = boards.copy()
+        guessed[rows, cell] = lowest
+        boards[rows, cell] ^= lowest
+        boards = np.concatenate([guessed, boards])
+        origin = np.concatenate([origin, origin])
+        depth += 1
+
+    solutions = solutions.reshape(count, 9, 9)
+    times = np.full(count, (time.perf_counter() - start) / max(count, 1))
+    for k in np.flatnonzero(leftover):
+        start = time.perf_counter()
+        solver = Solver(values[k].tolist())
+        solution = solver.solve()
+        times[k] += time.perf_counter() - start
+        stats[k] = (solver.nodes, solver.backtracks, solver.propagations, solver.max_depth)
+        if solution is not None:
+            solutions[k] = np.array(solution, dtype=np.uint8).reshape(9, 9)
+            solved[k] = True
+    return BatchResult(solutions, solved, times, stats)
+
+
+# solves one chunk of puzzles in the current process. This is what each worker
+# in the pool runs, so it has to stay a module level function to be picklable.
+def solve_chunk(puzzles, vectorized=False):
+    if vectorized:
+        return solve_vectorized(puzzles)
+    count = len(puzzles)
+    solutions = np.zeros((count, 9, 9), dtype=np.uint8)
+    solved = np.zeros(count, dtype=bool)
+    times = np.zeros(count, dtype=np.float64)
+    stats = np.zeros(count, dtype=STATS_DTYPE)
+    for k, puzzle in enumerate(puzzles.reshape(count, 81).tolist()):
+        start = time.perf_counter()
+        solver = Solver(puzzle)
+        solution = solver.solve()
+        times[k] = time.perf_counter() - start
+        stats[k] = (solver.nodes, solver.backtracks, solver.propagations, solver.max_depth)
+        if solution is not None:
+            solutions[k] = np.array(solution, dtype=np.uint8).reshape(9, 9)
+            solved[k] = True
+    return BatchResult(solutions, solved, times, stats)
+
+
+def as_puzzle_array(puzzles):
+    puzzles = np.asarray(puzzles)
+    if puzzles.ndim == 2 and puzzles.shape[1] == 81:
+        puzzles = puzzles.reshape(-1, 9, 9)
+    if puzzles.ndim != 3 or puzzles.shape[1:] != (9, 9):
+        raise ValueError("expected an array of shape (N, 9, 9), got " + str(puzzles.shape))
+    # casting would wrap digits outside 0-9 round into the range (260 to 4), so they
+    # are all turned into 10 first, which leaves those puzzles unsolved
+    if puzzles.dtype != np.uint8:
+        puzzles = np.where((puzzles < 0) | (puzzles > 9), 10, puzzles)
+    return puzzles.astype(np.uint8, copy=False)
+
+
+# solves an (N, 9, 9) array of puzzles. Chunks of puzzles are spread over a pool
+# of worker processes, each chunk being big enough that the cost of sending it
+# to a worker is small next to the cost of solving it. With vectorized=True each
+# chunk is solved with solve_vectorized, which is much faster on large sets of
+# puzzles that mostly don't need guessing.
+def solve_many(puzzles, workers=None, chunk_size=None, vectorized=False):
+    puzzles = as_puzzle_array(puzzles)
+    count = len(puzzles)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunk_size is None:
+        # a few chunks per worker keeps every core busy if some chunks are slower
+        chunk_size = max(1, -(-count // (workers * 4)))
+
+    if workers <= 1 or count <= chunk_size:
+        return solve_chunk(puzzles, vectorized)
+
+    chunks = [puzzles[i:i + chunk_size] for i in range(0, count, chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(solve_chunk, chunks, repeat(vectorized)))
+    return BatchResult(*(np.concatenate(parts) for parts in zip(*results)))
@@ -0,0 +1,180 @@
+import numpy as np
+
+from .solver import ALL_DIGITS, CELL_BOX, CELL_COL, CELL_ROW, UNITS, digit_bit
+
+# every cell is one record, so the whole board is a single contiguous array and a
+# snapshot of it is a single copy. The marks are bitmasks, bit (d - 1) meaning digit d.
+CELL_DTYPE = np.dtype([
+    ("starting", np.uint8),
+    ("value", np.uint8),
+    ("corner", np.uint16),
+    ("centre", np.uint16),
+    ("selected", np.bool_),
+    ("incorrect", np.bool_),
+    ("conflict", np.bool_),
+    ("hint", np.bool_),
+])
+
+# the parts of a cell an edit can change
+VALUE = 0
+CORNER = 1
+CENTRE = 2
+
+ROW_OF = np.array(CELL_ROW)
+COL_OF = np.array(CELL_COL)
+BOX_OF = np.array(CELL_BOX)
+# bit (d - 1) for each digit d, lined up with columns 1-9 of the digit counts
+DIGIT_BITS = (1 << np.arange(9)).astype(np.uint16)
+# for each cell, every cell that shares a row, column or box with it, itself included
+PEERS = [np.array(sorted({j for unit in UNITS if i in unit for j in unit})) for i in range(81)]
+
+
+class Board:
+    def __init__(self, puzzle):
+        self.cells = np.zeros((9, 9), dtype=CELL_DTYPE)
+        # views onto the fields of cells, changing these changes the board
+        self.starting = self.cells["starting"]
+        self.values = self.cells["value"]
+        self.corner = self.cells["corner"]
+        self.centre = self.cells["centre"]
+        self.selected = self.cells["selected"]
+        self.incorrect = self.cells["incorrect"]
+        self.hint = self.cells["hint"]
+        # the same fields again, indexed by cell number 0-80
+        flat = self.cells.reshape(81)
+        self.flat_values = flat["value"]
+        self.flat_conflict = flat["conflict"]
+        self.flat_centre = flat["centre"]
+        self.flat_hint = flat["hint"]
+        # how many times each digit appears in each row, column and box. Index 0
+        # counts the empty cells and is never looked at.
+        self.row_counts = np.zeros((9, 10), dtype=np.int16)
+        self.col_counts = np.zeros((9, 10), dtype=np.int16)
+        self.box_counts = np.zeros((9, 10), dtype=np.int16)
+        self.load(puzzle)
+
+    # replaces the whole board with a new puzzle
+    def load(self, puzzle):
+        self.cells[...] = np.zeros((), dtype=CELL_DTYPE)
+        self.starting[:] = np.asarray(puzzle, dtype=np.uint8).reshape(9, 9)
+        self.values[:] = self.starting
+        self.recount()
+
+    def snapshot(self):
+        return self.cells.copy()
+
+    def restore(self, snapshot):
+        self.cells[...] = snapshot
+        self.recount()
+
+    # rebuilds the digit counts from scratch, used after the whole board changes
+    def recount(self):
+        values = self.flat_values.astype(np.intp)
+        for counts, units in ((self.row_counts, ROW_OF), (self.col_counts, COL_OF), (self.box_counts, BOX_OF)):
+            counts[:] = 0
+            np.add.at(counts, (units, values), 1)
+        self.update_conflicts(np.arange(81))
+
+    # works out whether each of the given cells clashes with another cell, just by
+    # looking up its digit in the counts for its row, column and box
+    def update_conflicts(self, cells):
+        values = self.flat_values[cells].astype(np.intp)
+        repeated = ((self.row_counts[ROW_OF[cells], values] > 1) | (self.col_counts[COL_OF[cells], values] > 1)
+                    | (self.box_counts[BOX_OF[cells], values] > 1))
+        self.flat_conflict[cells] = repeated & (values != 0)
+
+    # edits
+
+    # changing a value only touches the counts for its row, column and box, and
+    # only the cells that can see it can start or stop clashing
+    def set_value(self, row, col, value):
+        old = int(self.values[row, col])
+        if old == value:
+            return
+        box = CELL_BOX[row * 9 + col]
+        self.row_counts[row, old] -= 1
+        self.col_counts[col, old] -= 1
+        self.box_counts[box, old] -= 1
+        self.values[row, col] = value
+        self.row_counts[row, value] += 1
+        self.col_counts[col, value] += 1
+        self.box_counts[box, value] += 1
+        self.update_conflicts(PEERS[row * 9 + col])
+
+    # reads or writes the value or one of the mark bitmasks of a cell, used when
+    # applying edits from the undo history
+    def get(self, kind, row, col):
+        if kind == VALUE:
+            return int(self.values[row, col])
+        if kind == CORNER:
+            return int(self.corner[row, col])
+        return int(self.centre[row, col])
+
+    def put(self, kind, row, col, value):
+        if kind == VALUE:
+            self.set_value(row, col, value)
+        elif kind == CORNER:
+            self.corner[row, col] = value
+        else:
+            self.centre[row, col] = value
+
+    def toggle_corner(self, row, col, digit):
+        self.corner[row, col] ^= digit_bit(digit)
+
+    def toggle_centre(self, row, col, digit):
+        self.centre[row, col] ^= digit_bit(digit)
+
+    def restart(self):
+        self.values[:] = self.starting
+        self.recount()
+        self.corner[:] = 0
+        self.centre[:] = 0
+
+    def deselect_all(self):
+        self.selected[:] = False
+
+    def reset_highlights(self):
+        self.incorrect[:] = False
+        self.hint[:] = False
+
+    # highlights the given cells (numbered 0-80) as part of a hint
+    def highlight_hint(self, cells):
+        self.flat_hint[cells] = True
+
+    # checks
+
+    def valid_placement(self, row, col, number):
+        return not (self.row_counts[row, number] or self.col_counts[col, number]
+                    or self.box_counts[CELL_BOX[row * 9 + col], number])
+
+    # the digits each empty cell could still be, as a 9x9 array of bitmasks (0 for
+    # filled cells). The digits used by each unit come straight from the counts, so
+    # the whole board is worked out in one pass.
+    def candidates(self):
+        row_used = ((self.row_counts[:, 1:] > 0) * DIGIT_BITS).sum(axis=1)
+        col_used = ((self.col_counts[:, 1:] > 0) * DIGIT_BITS).sum(axis=1)
+        box_used = ((self.box_counts[:, 1:] > 0) * DIGIT_BITS).sum(axis=1)
+        used = (row_used[ROW_OF] | col_used[COL_OF] | box_used[BOX_OF]).reshape(9, 9)
+        return np.where(self.values == 0, ALL_DIGITS & ~used, 0).astype(np.uint16)
+
+    # the cells (as numbers 0-80) that can see the given cell and have a centre mark
+    # for the given digit
+    def peers_with_centre_mark(self, row, col, digit):
+        peers = PEERS[row * 9 + col]
+        return peers[(self.flat_centre[peers] & digit_bit(digit)) != 0]
+
+    # marks empty and clashing cells as incorrect, returns True if the board is solved
+    # with the solution, wrong digits are found before the board is full. A full
+    # board with no clashes is right whatever the solution says, in case the puzzle
+    # has more than one
+    def check(self, solution=None):
+        wrong = (self.values == 0) | self.cells["conflict"]
+        if solution is not None and wrong.any():
+            wrong |= (self.values != 0) & (self.values != np.asarray(solution).reshape(9, 9))
+        self.incorrect |= wrong
+        return not wrong.any()
+
+    # writes a whole solution (81 digits) into the board in one go
+    def apply_solution(self, solution):
+        self.values[:] = np.array(solution, dtype=np.uint8).reshape(9, 9)
+        self.recount()
@@ -0,0 +1,119 @@
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from .canonical import canonical_form, from_canonical, to_canonical
+from .solver import Solver, flatten_puzzle
+
+
+# remembers the solutions of puzzles it has seen. Solutions are stored against the
+# puzzle's canonical form, so a puzzle that is a relabelled, reordered or transposed
+# version of one seen before is answered without solving it. The exact puzzles
+# asked for are remembered too, which skips working out the canonical form when the
+# same puzzle comes up again.
+#
+# The most recently used capacity entries are kept in memory. With a path the
+# solutions are also added to a file there, one 162 byte record per puzzle (the
+# canonical puzzle then its solution, a byte per digit), which is read back in when
+# the cache is made so solutions carry over between sessions.
+#
+# Puzzles found to have no solution are remembered too, with a solution of all
+# zeros, so they are never searched twice.
+class SolutionCache:
+    record_length = 162
+
+    def __init__(self, capacity=1000, path=None):
+        self.capacity = capacity
+        self.path = path
+        # canonical or exact puzzle bytes -> solution bytes in the same form, most
+        # recently used last. Exact entries are keyed with a leading "=".
+        self.entries = OrderedDict()
+        # canonical puzzle bytes -> position of its record in the file
+        self.index = {}
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            with open(path, "rb") as file:
+                data = file.read()
+            for offset in range(0, len(data) - self.record_length + 1, self.record_length):
+                self.index[data[offset:offset + 81]] = offset
+
+    def __len__(self):
+        return len(self.entries)
+
+    def remember(self, key, solution):
+        self.entries[key] = solution
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def recall(self, key):
+        solution = self.entries.get(key)
+        if solution is not None:
+            self.entries.move_to_end(key)
+            return solution
+        offset = self.index.get(key)
+        if offset is None:
+            return None
+        with open(self.path, "rb") as file:
+            file.seek(offset + 81)
+            solution = file.read(81)
+        self.remember(key, solution)
+        return solution
+
+    # returns the solution as a flat list of 81 digits, an empty list if the puzzle
+    # is known to have no solution, or None if it isn't known
+    def get(self, puzzle):
+        return self.find(puzzle)[0]
+
+    # like get, but returns (solution, form) where form is the puzzle's canonical
+    # form if it had to be worked out. Passing it on to put saves working it out
+    # again when the puzzle is then solved
+    def find(self, puzzle):
+        values = np.array(flatten_puzzle(puzzle), dtype=np.uint8)
+        exact = self.recall(b"=" + values.tobytes())
+        if exact is not None:
+            self.hits += 1
+            return (list(exact) if any(exact) else []), None
+        form = canonical_form(values)
+        solution = self.recall(form[0]) if form else None
+        if solution is None:
+            self.misses += 1
+            return None, form
+        self.hits += 1
+        solution = from_canonical(np.frombuffer(solution, dtype=np.uint8), form[1]).ravel()
+        self.remember(b"=" + values.tobytes(), solution.tobytes())
+        return (solution.tolist() if solution.any() else []), form
+
+    # stores a solution, or that the puzzle has none if solution is None. form is
+    # the puzzle's canonical form from find, if it's been worked out already
+    def put(self, puzzle, solution, form=None):
+        values = np.array(flatten_puzzle(puzzle), dtype=np.uint8)
+        if solution is None:
+            solution = np.zeros(81, dtype=np.uint8)
+        solution = np.array(solution, dtype=np.uint8).reshape(81)
+        self.remember(b"=" + values.tobytes(), solution.tobytes())
+        if form is None:
+            form = canonical_form(values)
+        if form is None:
+            return
+        key, transform = form
+        canonical = to_canonical(solution, transform).tobytes()
+        self.remember(key, canonical)
+        if self.path and key not in self.index:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "ab") as file:
+                self.index[key] = file.tell()
+                file.write(key + canonical)
+
+    # the solution from the cache, otherwise from the solver (which is then cached,
+    # whether it found one or not). Returns None if the puzzle has no solution.
+    def solve(self, puzzle):
+        solution, form = self.find(puzzle)
+        if solution is None:
+            solution = Solver(puzzle).solve()
+            self.put(puzzle, solution, form)
+        return solution or None
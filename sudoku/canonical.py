@@ -0,0 +1,96 @@
+from itertools import permutations, product
+
+import numpy as np
+
+from .solver import flatten_puzzle
+
+# puzzles that are the same up to relabelling the digits, reordering the bands, the
+# stacks, the rows within a band or the columns within a stack, and transposing,
+# all have the same solution up to the same changes. The canonical form of a
+# puzzle is the smallest of all of these versions, read row by row with the digits
+# numbered in the order they first appear, so every version has the same one.
+
+TRIPLES = list(permutations(range(3)))
+# every order of the columns that keeps the stacks together, 6 ** 4 of them
+COLUMN_ORDERS = np.array([[3 * stack + i for stack, within in zip(stacks, orders) for i in within]
+                          for stacks, *orders in product(TRIPLES, repeat=4)])
+BAND_OF = np.arange(9) // 3
+
+# below this many clues the number of versions that tie gets too big to search, and
+# a puzzle can't have only one solution anyway
+MIN_CLUES = 17
+
+
+# returns (key, transform), where key is the canonical form as 81 bytes and
+# transform takes the puzzle to it (see to_canonical). Returns None for puzzles
+# with fewer than MIN_CLUES clues.
+#
+# The canonical grid is built a row at a time. Every way of getting to the smallest
+# rows so far is kept, and for the next row each of them tries every row it's still
+# allowed to use (the rest of the current band, or the first row of a new band).
+# The column order is picked along with the first row.
+def canonical_form(puzzle):
+    grid = np.array(flatten_puzzle(puzzle), dtype=np.intp).reshape(9, 9)
+    if np.count_nonzero(grid) < MIN_CLUES:
+        return None
+    grids = np.stack([grid, grid.T])
+
+    flipped, order = (a.ravel() for a in np.meshgrid(np.arange(2), np.arange(len(COLUMN_ORDERS)), indexing="ij"))
+    rows = np.zeros((len(order), 0), dtype=np.intp)
+    mapping = np.zeros((len(order), 10), dtype=np.intp)
+    labels = np.zeros(len(order), dtype=np.intp)
+    canonical = np.zeros((9, 9), dtype=np.uint8)
+    for r in range(9):
+        # the source rows each state can use next
+        used = np.zeros((len(order), 9), dtype=bool)
+        used[np.arange(len(order))[:, None], rows] = True
+        if r % 3:
+            allowed = (BAND_OF == BAND_OF[rows[:, -1:]]) & ~used
+        else:
+            band_used = used.reshape(-1, 3, 3).any(axis=2)
+            allowed = ~band_used[:, BAND_OF]
+        state, row = np.nonzero(allowed)
+        flipped, order, mapping, labels = flipped[state], order[state], mapping[state], labels[state].copy()
+        rows = np.concatenate([rows[state], row[:, None]], axis=1)
+
+        # the row each state would make, renumbering digits the first time they're seen
+        values = grids[flipped[:, None], row[:, None], COLUMN_ORDERS[order]]
+        index = np.arange(len(order))
+        code = np.zeros(len(order), dtype=np.int64)
+        for c in range(9):
+            digit = values[:, c]
+            label = mapping[index, digit]
+            new = (digit != 0) & (label == 0)
+            labels += new
+            mapping[index[new], digit[new]] = labels[new]
+            label = np.where(new, labels, label)
+            code = code * 10 + label
+
+        best = code == code.min()
+        flipped, order, rows, mapping, labels = flipped[best], order[best], rows[best], mapping[best], labels[best]
+        canonical[r] = mapping[0, values[np.nonzero(best)[0][0]]]
+
+    # digits missing from the puzzle get the labels that are left over, in order
+    relabel = mapping[0].copy()
+    missing = [d for d in range(1, 10) if relabel[d] == 0]
+    relabel[missing] = sorted(set(range(1, 10)) - set(relabel[1:]))
+    return canonical.tobytes(), (bool(flipped[0]), rows[0], COLUMN_ORDERS[order[0]], relabel)
+
+
+# applies a transform from canonical_form to a 9x9 grid, like the puzzle's solution
+def to_canonical(grid, transform):
+    flipped, rows, cols, relabel = transform
+    grid = np.asarray(grid, dtype=np.intp).reshape(9, 9)
+    if flipped:
+        grid = grid.T
+    return relabel[grid[np.ix_(rows, cols)]].astype(np.uint8)
+
+
+# undoes a transform, taking a grid in canonical form back to the puzzle's
+def from_canonical(grid, transform):
+    flipped, rows, cols, relabel = transform
+    inverse = np.zeros(10, dtype=np.uint8)
+    inverse[relabel] = np.arange(10)
+    result = np.zeros((9, 9), dtype=np.uint8)
+    result[np.ix_(rows, cols)] = inverse[np.asarray(grid, dtype=np.intp).reshape(9, 9)]
+    return result.T.copy() if flipped else result
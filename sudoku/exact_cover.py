@@ -0,0 +1,207 @@
+from itertools import islice
+from math import isqrt
+
+import numpy as np
+
+
+# what a puzzle looks like: how many rows, columns and digits it has, the size of
+# its boxes and any extra rules. Boxes are box_rows tall and box_cols wide and
+# default to square, or as close to square as the size allows (2x3 for 6x6).
+# With diagonal=True both long diagonals must hold every digit once. cages is a
+# list of killer cages, each a (total, cells) pair with cells numbered row by row
+# from 0: the digits in a cage add up to its total and don't repeat.
+class Shape:
+    def __init__(self, size=9, box_rows=None, box_cols=None, diagonal=False, cages=()):
+        if box_rows is None:
+            box_rows = isqrt(size) if box_cols is None else size // box_cols
+            while size % box_rows:
+                box_rows -= 1
+        if box_cols is None:
+            box_cols = size // box_rows
+        if box_rows * box_cols != size:
+            raise ValueError(str(box_rows) + "x" + str(box_cols) + " boxes don't fit a " + str(size) + " grid")
+        self.size = size
+        self.box_rows = box_rows
+        self.box_cols = box_cols
+        self.diagonal = diagonal
+        self.cages = [(total, list(cells)) for total, cells in cages]
+
+    # the shape of a plain puzzle with as many cells as the one given
+    @classmethod
+    def of(cls, puzzle):
+        count = np.asarray(puzzle).size
+        size = isqrt(count)
+        if size * size != count:
+            raise ValueError("a puzzle of " + str(count) + " cells isn't square")
+        return cls(size)
+
+    def box(self, row, col):
+        return row // self.box_rows * self.box_rows + col // self.box_cols
+
+
+# whether count different digits out of the sorted list digits could add up to
+# total, going by the smallest and largest sums they can make
+def sum_fits(total, count, digits):
+    if count == 0:
+        return total == 0
+    return count <= len(digits) and sum(digits[:count]) <= total <= sum(digits[len(digits) - count:])
+
+
+# solves puzzles of any Shape as an exact cover problem with Knuth's Algorithm X.
+# Every (cell, digit) choice is a row covering a column for its cell and for the
+# digit in its row, column and box (and diagonal). A solution picks rows covering
+# each column exactly once. Cage digits are secondary columns, covered at most
+# once, and cage totals are checked as digits go in.
+#
+# The cover is kept as a dict of sets (column -> rows still covering it) rather
+# than linked lists, which does the same job with Python's own data structures.
+class ExactCoverSolver:
+    def __init__(self, puzzle, shape=None):
+        self.shape = shape or Shape.of(puzzle)
+        self.puzzle = [int(v) for v in np.asarray(puzzle).ravel()]
+        size = self.shape.size
+        if len(self.puzzle) != size * size or not all(0 <= v <= size for v in self.puzzle):
+            raise ValueError("puzzle doesn't fit a " + str(size) + "x" + str(size) + " grid")
+        self.nodes = 0
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    # builds the rows and columns. Columns are numbered: one per cell, then one per
+    # (row, digit), (column, digit), (box, digit) and (diagonal, digit), which must
+    # all be covered, then one per (cage, digit).
+    def build(self):
+        shape = self.shape
+        n = shape.size
+        area = n * n
+        self.primary = 4 * area + (2 * n if shape.diagonal else 0)
+        self.cage_of = {}
+        # the digits that could go in each cage, given its size and total
+        self.cage_digits = []
+        for k, (total, cells) in enumerate(shape.cages):
+            for cell in cells:
+                self.cage_of[cell] = k
+            self.cage_digits.append({d for d in range(1, n + 1)
+                                     if sum_fits(total - d, len(cells) - 1, [e for e in range(1, n + 1) if e != d])})
+        self.cage_left = [total for total, cells in shape.cages]
+        self.cage_cells_left = [len(cells) for total, cells in shape.cages]
+        self.cage_used = [0] * len(shape.cages)
+
+        self.rows = {}
+        for cell in range(area):
+            r, c = divmod(cell, n)
+            cage = self.cage_of.get(cell)
+            for d in range(n):
+                if cage is not None and d + 1 not in self.cage_digits[cage]:
+                    continue
+                columns = [cell, area + r * n + d, 2 * area + c * n + d, 3 * area + shape.box(r, c) * n + d]
+                if shape.diagonal and r == c:
+                    columns.append(4 * area + d)
+                if shape.diagonal and r + c == n - 1:
+                    columns.append(4 * area + n + d)
+                if cage is not None:
+                    columns.append(self.primary + cage * n + d)
+                self.rows[cell * n + d] = columns
+        self.columns = {}
+        for row, columns in self.rows.items():
+            for column in columns:
+                self.columns.setdefault(column, set()).add(row)
+        # a column nothing can cover means there's no solution
+        self.impossible = any(column not in self.columns for column in range(self.primary))
+
+    def select(self, row):
+        columns = self.columns
+        removed = []
+        for j in self.rows[row]:
+            for i in columns[j]:
+                for k in self.rows[i]:
+                    if k != j:
+                        columns[k].discard(i)
+            removed.append(columns.pop(j))
+        return removed
+
+    def deselect(self, row, removed):
+        columns = self.columns
+        for j in reversed(self.rows[row]):
+            columns[j] = removed.pop()
+            for i in columns[j]:
+                for k in self.rows[i]:
+                    if k != j:
+                        columns[k].add(i)
+
+    # whether the digit of a row can still go in its cage: the cage's remaining cells
+    # must be able to make up what's left of its total with digits it hasn't used
+    def cage_allows(self, row):
+        n = self.shape.size
+        cell, d = divmod(row, n)
+        cage = self.cage_of.get(cell)
+        if cage is None:
+            return True
+        unused = [digit for digit in range(1, n + 1) if digit != d + 1 and not self.cage_used[cage] >> digit & 1]
+        return sum_fits(self.cage_left[cage] - (d + 1), self.cage_cells_left[cage] - 1, unused)
+
+    def cage_place(self, row, sign):
+        cell, d = divmod(row, self.shape.size)
+        cage = self.cage_of.get(cell)
+        if cage is not None:
+            self.cage_left[cage] -= sign * (d + 1)
+            self.cage_cells_left[cage] -= sign
+            self.cage_used[cage] ^= 1 << (d + 1)
+
+    def search(self, chosen):
+        if self.cancelled:
+            return
+        self.nodes += 1
+        # the column with the fewest ways left to cover it
+        best = None
+        best_count = None
+        for column, rows in self.columns.items():
+            if column < self.primary and (best is None or len(rows) < best_count):
+                best, best_count = column, len(rows)
+                if best_count <= 1:
+                    break
+        if best is None:
+            yield list(chosen)
+            return
+        for row in list(self.columns[best]):
+            if not self.cage_allows(row):
+                continue
+            self.cage_place(row, 1)
+            removed = self.select(row)
+            chosen.append(row)
+            yield from self.search(chosen)
+            chosen.pop()
+            self.deselect(row, removed)
+            self.cage_place(row, -1)
+
+    # yields every solution as a flat list of digits, row by row
+    def solutions(self):
+        self.build()
+        if self.impossible:
+            return
+        n = self.shape.size
+        chosen = []
+        for cell, value in enumerate(self.puzzle):
+            if value:
+                row = cell * n + value - 1
+                # a given that clashes with an earlier one, or can't go in its cage
+                if row not in self.rows or row not in self.columns.get(cell, ()) or not self.cage_allows(row):
+                    return
+                self.cage_place(row, 1)
+                self.select(row)
+                chosen.append(row)
+        for rows in self.search(chosen):
+            solution = [0] * (n * n)
+            for row in rows:
+                cell, d = divmod(row, n)
+                solution[cell] = d + 1
+            yield solution
+
+    # returns the first solution found, or None if there isn't one
+    def solve(self):
+        return next(self.solutions(), None)
+
+    # counts solutions, stopping once limit have been found
+    def count_solutions(self, limit=2):
+        return sum(1 for _ in islice(self.solutions(), limit))
@@ -0,0 +1,273 @@
+import numpy as np
+
+from .actions import Centre, ClearMarks, Corner
+from .board import CENTRE, CORNER, VALUE, Board
+from .cache import SolutionCache
+from .hints import Step, cell_name, describe, next_step
+from .history import History
+from .solver import ALL_DIGITS, Solver, digit_bit
+from .worker import SolveJob
+
+starting_sudoku = np.array([
+    [0, 3, 0, 0, 0, 0, 0, 0, 0],
+    [0, 4, 0, 0, 5, 0, 0, 1, 0],
+    [0, 2, 0, 6, 1, 3, 5, 0, 4],
+
+    [0, 0, 6, 8, 0, 2, 0, 0, 5],
+    [0, 1, 8, 7, 0, 0, 3, 0, 0],
+    [7, 0, 3, 1, 0, 6, 2, 0, 8],
+
+    [1, 0, 0, 4, 0, 9, 7, 0, 6],
+    [9, 0, 0, 3, 7, 8, 4, 0, 1],
+    [0, 0, 0, 0, 6, 1, 9, 0, 0]
+])
+
+
+# the state of a game and everything a player can do to it. This has nothing to do
+# with pygame, so it can be driven by the interface, a script or a test alike.
+class Game:
+    def __init__(self, puzzle=starting_sudoku, undo_limit=10000, solutions=None):
+        # the board holds the state of every square in a few numpy arrays
+        self.board = Board(puzzle)
+        # every edit is logged as a small packed delta to be used with the undo and
+        # redo functions, only the last undo_limit edits are kept
+        self.history = History(undo_limit)
+        # when this is on the centre marks are filled with every square's candidates,
+        # and placing a digit removes it from the marks of the squares it can see
+        self.auto_candidates = False
+        # what the last hint was, shown in the menu
+        self.hint_text = ()
+        self.time = 0
+        # the solve that is running in the background, if there is one
+        self.solve_job = None
+        self.solve_start = None
+        self.solve_form = None
+        # the search for the puzzle's own solution that checks and hints start when
+        # the cache doesn't have it
+        self.lookup_job = None
+        # the solver's counters from the last solve, see Solver.stats. None if
+        # the solution came from the cache
+        self.solve_stats = None
+        # solutions of puzzles seen before, which can be shared between games
+        self.solutions = solutions if solutions is not None else SolutionCache()
+
+    # whenever you edit a square it will go through the perform_action function
+    def perform_action(self, action):
+        row, col = action.cell_row, action.cell_col
+        # inputs change different values depending on what type of mark the user is
+        # trying to do. Marks are toggled, so doing the same mark twice removes it
+        if isinstance(action, Centre):
+            self.edit(CENTRE, row, col, self.board.get(CENTRE, row, col) ^ digit_bit(action.new_value))
+        elif isinstance(action, Corner):
+            self.edit(CORNER, row, col, self.board.get(CORNER, row, col) ^ digit_bit(action.new_value))
+        elif isinstance(action, ClearMarks):
+            with self.history.group():
+                self.edit(CORNER, row, col, 0)
+                self.edit(CENTRE, row, col, 0)
+        else:
+            with self.history.group():
+                self.edit(VALUE, row, col, action.new_value)
+                if self.auto_candidates and action.new_value:
+                    self.prune_candidates(row, col, action.new_value)
+
+    # changes one part of a square and logs it, edits that change nothing aren't logged
+    def edit(self, kind, row, col, new):
+        old = self.board.get(kind, row, col)
+        if old != new:
+            self.board.put(kind, row, col, new)
+            self.history.record(row * 9 + col, kind, old, new)
+
+    # fills every empty square's centre marks with the digits it could be, as a
+    # single undoable edit
+    def fill_candidates(self):
+        candidates = self.board.candidates()
+        with self.history.group():
+            for r, c in zip(*np.nonzero(candidates != self.board.centre)):
+                self.edit(CENTRE, int(r), int(c), int(candidates[r, c]))
+
+    def prune_candidates(self, row, col, digit):
+        for cell in self.board.peers_with_centre_mark(row, col, digit):
+            r, c = divmod(int(cell), 9)
+            self.edit(CENTRE, r, c, self.board.get(CENTRE, r, c) & ~digit_bit(digit))
+
+    # the solution of the puzzle being played as a 9x9 array, or None if it isn't
+    # known or there isn't one. Only the cache is asked, so a hard puzzle can't hold
+    # things up: if the cache doesn't have it a search is started in the background
+    # and the solution is there for the next check or hint
+    def solution(self):
+        solution = self.solutions.get(self.board.starting)
+        if solution is None and self.lookup_job is None:
+            self.lookup_job = SolveJob(self.board.starting.copy()).start()
+        return np.array(solution, dtype=np.uint8).reshape(9, 9) if solution else None
+
+    # finds the easiest next deduction and highlights the squares involved. With
+    # automatic candidates on the centre marks are used, so the hints build on the
+    # eliminations already made. Digits that don't match the solution are pointed
+    # out first, and if no technique finds anything a square is filled in from it.
+    # Both need the solution to be known already, see solution
+    def show_hint(self):
+        self.board.reset_highlights()
+        solution = self.solution()
+        if solution is not None:
+            mistakes = np.flatnonzero((self.board.values != 0) & (self.board.values != solution))
+            if len(mistakes):
+                self.board.highlight_hint(mistakes)
+                cell = int(mistakes[0])
+                self.hint_text = ("Mistake", cell_name(cell) + " is not " + str(self.board.flat_values[cell]))
+                return None
+        candidates = None
+        if self.auto_candidates:
+            candidates = np.where(self.board.centre != 0, self.board.centre, ALL_DIGITS)
+        step = next_step(self.board.values, candidates)
+        if step is None and solution is not None and (self.board.values == 0).any():
+            cell = int(np.flatnonzero(self.board.values == 0)[0])
+            step = Step("Reveal", [cell], [(cell, int(solution.flat[cell]))], [])
+        if step is None:
+            self.hint_text = ("No hint found",)
+            return None
+        cells = step.cells + [cell for cell, digit in step.placements] + [cell for cell, mask in step.eliminations]
+        self.board.highlight_hint(cells)
+        self.hint_text = (step.technique, describe(step))
+        return step
+
+    def toggle_auto_candidates(self):
+        self.auto_candidates = not self.auto_candidates
+        if self.auto_candidates:
+            self.fill_candidates()
+
+    # Only undoes actions that edit a square's values. Edits made together, like
+    # typing into several squares at once, are undone together
+    def undo_action(self):
+        for cell, kind, old, new in self.history.undo():
+            self.board.put(kind, cell // 9, cell % 9, old)
+
+    def redo_action(self):
+        for cell, kind, old, new in self.history.redo():
+            self.board.put(kind, cell // 9, cell % 9, new)
+
+    # Checks if a a value for a certain square is valid
+    def valid_placement(self, row, col, number):
+        return self.board.valid_placement(row, col, number)
+
+    # a solution for the board as it is if the cache has one, without solving
+    # anything: the puzzle's own solution when the digits placed so far agree with
+    # it, otherwise whatever the cache has for the board. An empty list means the
+    # board is known to have no solution.
+    #
+    # Returns (solution, form), form being the board's canonical form if it was
+    # worked out, for SolutionCache.put once the board has been solved
+    def known_solution(self):
+        solution, form = self.solutions.find(self.board.starting)
+        values = self.board.values
+        if solution == []:
+            return solution, None
+        if solution is not None:
+            solution = np.array(solution, dtype=np.uint8).reshape(9, 9)
+            if ((values == 0) | (values == solution)).all():
+                return solution, None
+        # nothing's been placed yet, so the board is the puzzle just looked up
+        if (values == self.board.starting).all():
+            return None, form
+        return self.solutions.find(values)
+
+    # the search itself is done by the solver engine, which works on plain bitmasks.
+    # The result is then written back into the board.
+    def solve(self):
+        solution, form = self.known_solution()
+        self.solve_stats = None
+        if solution is None:
+            solver = Solver(self.board.values)
+            solution = solver.solve()
+            self.solve_stats = solver.stats()
+            self.solutions.put(self.board.values, solution, form)
+        if solution is None or len(solution) == 0:
+            return False
+        self.board.apply_solution(solution)
+        return True
+
+    # runs the solver on a background thread so an interface keeps responding, it
+    # then calls finish_solve every frame to pick up the result. A known solution is
+    # filled in straight away instead, in which case this returns False, as it does
+    # for a board that's known to have no solution
+    def start_solve(self):
+        solution, self.solve_form = self.known_solution()
+        if solution is not None:
+            self.solve_stats = None
+            if len(solution):
+                self.board.apply_solution(solution)
+            else:
+                self.hint_text = ("No solution",)
+            return False
+        self.solve_start = self.board.values.copy()
+        self.solve_job = SolveJob(self.solve_start).start()
+        return True
+
+    def cancel_solve(self):
+        if self.solve_job:
+            self.solve_job.cancel()
+
+    def cancel_lookup(self):
+        if self.lookup_job:
+            self.lookup_job.cancel()
+            self.lookup_job = None
+
+    # returns True once the background solve has ended. The solution is written
+    # into the board all at once, but only if the board is still the one that was
+    # being solved. Whatever a finished search found, even that there is no
+    # solution, goes in the cache
+    def finish_solve(self):
+        self.finish_lookup()
+        job = self.solve_job
+        if job is None or not job.done():
+            return False
+        self.solve_job = None
+        self.solve_stats = job.stats()
+        if not job.cancelled:
+            self.solutions.put(self.solve_start, job.solution, self.solve_form)
+            if job.solution is None:
+                self.hint_text = ("No solution",)
+            elif (self.board.values == self.solve_start).all():
+                self.board.apply_solution(job.solution)
+        return True
+
+    def finish_lookup(self):
+        job = self.lookup_job
+        if job is not None and job.done():
+            self.lookup_job = None
+            if not job.cancelled:
+                self.solutions.put(job.puzzle, job.solution)
+
+    # removes the yellow colouring from all squares
+    def deselect_all(self):
+        self.board.deselect_all()
+
+    # checks first if the user has finished the sudoku, then if the inputs they
+    # have are correct
+    def check_board(self):
+        return self.board.check(self.solution())
+
+    # restarts the sudoku. With automatic candidates on the marks wiped with the
+    # board are filled in again, before the history is cleared so that can't be undone
+    def restart_game(self):
+        self.board.restart()
+        if self.auto_candidates:
+            self.fill_candidates()
+        self.history.clear()
+        self.time = 0
+
+    # starts a different sudoku
+    def new_game(self, puzzle):
+        self.cancel_solve()
+        self.cancel_lookup()
+        self.board.load(puzzle)
+        if self.auto_candidates:
+            self.fill_candidates()
+        self.history.clear()
+        self.hint_text = ()
+        self.time = 0
+
+    # when the user clicks the check button, mistakes are highlighted. This function
+    # undoes that highlighting
+    def reset_highlights(self):
+        self.board.reset_highlights()
+        self.hint_text = ()
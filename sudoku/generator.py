@@ -0,0 +1,158 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .hints import basic_candidates, next_step
+from .loader import format_puzzle, parse_puzzle
+from .solver import BOX_CELLS, Solver
+
+DIFFICULTIES = ["easy", "medium", "hard", "expert", "extreme"]
+
+# how hard each technique is, as an index into DIFFICULTIES. A puzzle is as hard as
+# the hardest technique needed to solve it, and "extreme" if the techniques the
+# hint engine knows aren't enough.
+TECHNIQUE_LEVELS = {
+    "Naked single": 0,
+    "Hidden single": 0,
+    "Pointing": 1,
+    "Claiming": 1,
+    "Naked pair": 1,
+    "Hidden pair": 1,
+    "Naked triple": 2,
+    "Hidden triple": 2,
+    "X-wing": 2,
+    "XY-wing": 3,
+    "Swordfish": 3,
+}
+
+
+# a random full grid. The three boxes on the diagonal don't share a row or column,
+# so they can each be filled with any order of 1-9 and the solver fills in the rest.
+def random_solution(rng):
+    cells = [0] * 81
+    for box in (0, 4, 8):
+        for i, digit in zip(BOX_CELLS[box], rng.sample(range(1, 10), 9)):
+            cells[i] = digit
+    return Solver(cells).solve()
+
+
+# removes clues from a full grid in a random order, keeping each removal only if the
+# puzzle still has exactly one solution. With symmetric=True clues are removed in
+# pairs that mirror each other through the centre, like most published puzzles.
+def make_puzzle(rng, symmetric=True):
+    puzzle = random_solution(rng)
+    order = list(range(41 if symmetric else 81))
+    rng.shuffle(order)
+    for i in order:
+        cells = {i, 80 - i} if symmetric else {i}
+        removed = [(j, puzzle[j]) for j in cells]
+        for j in cells:
+            puzzle[j] = 0
+        if Solver(puzzle).count_solutions(2) != 1:
+            for j, value in removed:
+                puzzle[j] = value
+    return puzzle
+
+
+# solves the puzzle step by step with the hint engine and returns the name of its
+# difficulty
+def grade(puzzle):
+    values = [int(v) for v in np.asarray(puzzle).ravel()]
+    candidates = basic_candidates(values)
+    level = 0
+    while 0 in values:
+        step = next_step(values, candidates)
+        if step is None:
+            return DIFFICULTIES[-1]
+        level = max(level, TECHNIQUE_LEVELS[step.technique])
+        for cell, digit in step.placements:
+            values[cell] = digit
+        for cell, mask in step.eliminations:
+            candidates[cell] &= ~mask
+        # placing a digit removes it from the candidates of the cells that see it
+        basic = basic_candidates(values)
+        candidates = [a & b for a, b in zip(candidates, basic)]
+    return DIFFICULTIES[level]
+
+
+# makes count graded puzzles, returned as (81 character string, difficulty) pairs.
+# This is what each worker process runs when filling a pool.
+def generate_chunk(count, seed=None):
+    rng = random.Random(seed)
+    puzzles = []
+    for _ in range(count):
+        puzzle = make_puzzle(rng)
+        puzzles.append((format_puzzle(puzzle), grade(puzzle)))
+    return puzzles
+
+
+# puzzles made ahead of time, stored on disk as one file per difficulty with one
+# puzzle per line. Every line is the same length, so a random puzzle can be read
+# straight from its position in the file without reading the rest.
+class PuzzlePool:
+    line_length = 82
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, difficulty):
+        return os.path.join(self.directory, difficulty + ".txt")
+
+    def size(self, difficulty=None):
+        if difficulty is None:
+            return sum(self.size(name) for name in DIFFICULTIES)
+        try:
+            return os.path.getsize(self.path(difficulty)) // self.line_length
+        except OSError:
+            return 0
+
+    def add(self, puzzles):
+        os.makedirs(self.directory, exist_ok=True)
+        by_difficulty = {}
+        for text, difficulty in puzzles:
+            by_difficulty.setdefault(difficulty, []).append(text + "\n")
+        for difficulty, lines in by_difficulty.items():
+            with open(self.path(difficulty), "a", newline="") as file:
+                file.writelines(lines)
+
+    # generates count new puzzles across a pool of worker processes and adds them
+    def fill(self, count, workers=None, seed=None):
+        workers = workers or os.cpu_count() or 1
+        rng = random.Random(seed)
+        chunk_size = max(1, min(50, -(-count // workers)))
+        chunks = [min(chunk_size, count - start) for start in range(0, count, chunk_size)]
+        seeds = [rng.getrandbits(64) for _ in chunks]
+        if workers <= 1:
+            for size, chunk_seed in zip(chunks, seeds):
+                self.add(generate_chunk(size, chunk_seed))
+            return
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # chunks are added as they finish so a long run can be stopped part way
+            for puzzles in executor.map(generate_chunk, chunks, seeds):
+                self.add(puzzles)
+
+    # returns a random puzzle from the pool as a 9x9 array, or None if it's empty.
+    # Without a difficulty every puzzle in the pool is equally likely.
+    def take(self, difficulty=None, rng=random):
+        names = [difficulty] if difficulty else DIFFICULTIES
+        sizes = [self.size(name) for name in names]
+        if not sum(sizes):
+            return None
+        index = rng.randrange(sum(sizes))
+        for name, size in zip(names, sizes):
+            if index < size:
+                with open(self.path(name), "rb") as file:
+                    file.seek(index * self.line_length)
+                    return parse_puzzle(file.read(81).decode("ascii"))
+            index -= size
+
+
+# a puzzle from the pool if there is one, otherwise a freshly made one
+def new_puzzle(pool, difficulty=None):
+    puzzle = pool.take(difficulty) if pool else None
+    if puzzle is None:
+        puzzle = np.array(make_puzzle(random.Random()), dtype=np.uint8).reshape(9, 9)
+    return puzzle
+
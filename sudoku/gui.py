@@ -0,0 +1,531 @@
+import os
+import sys
+
+import numpy as np
+import pygame as pg
+from pygame.locals import *
+
+from .actions import Actions, Centre, ClearMarks, Corner
+from .cache import SolutionCache
+from .game import Game, starting_sudoku
+from .generator import PuzzlePool, new_puzzle
+from .loader import load_puzzle
+from .session import Autosave, read_session, restore_session
+from .solver import mask_digits
+
+menu_width = 225
+grid_height = 630
+grid_width = 630
+window_width = grid_width + menu_width
+window_height = grid_height
+square_size = grid_width // 3
+cell_size = square_size // 3
+timer_rect = pg.Rect(grid_width + 25, 8 * cell_size, menu_width - 50, 3 * cell_size // 4)
+status_rect = pg.Rect(grid_width + 25, 7 * cell_size, menu_width - 50, cell_size)
+
+white = (255, 255, 255)
+black = (0, 0, 0)
+yellow = (255, 255, 0)
+grey = (120, 120, 120)
+red = (255, 0, 0)
+blue = (0, 0, 255)
+green = (0, 255, 0)
+light_blue = (170, 210, 255)
+
+# what each key does, looked up on every key press
+key_dic = {K_1: 1, K_2: 2, K_3: 3, K_4: 4, K_5: 5, K_6: 6, K_7: 7, K_8: 8, K_9: 9, K_DELETE: "delete",
+           K_UP: "up", K_LEFT: "left", K_RIGHT: "right", K_DOWN: "down", K_LSHIFT: "left_shift",
+           K_LCTRL: "left_ctrl", K_z: "z", K_y: "y", K_a: "a", K_h: "h", K_n: "n"}
+# the arrow keys as (row, col) steps
+arrow_dic = {"up": (-1, 0), "down": (1, 0), "left": (0, -1), "right": (0, 1)}
+
+# sent by a timer when the clock next needs to change, or more often while a solve
+# is running so its progress keeps being shown
+clock_event = pg.USEREVENT
+solve_progress_interval = 100
+
+# puzzles generated ahead of time with: python -m sudoku.make_pool pool 1000
+pool_directory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pool")
+# the game in progress is kept saved here and picked up again the next time
+session_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "session.bin")
+# solutions found in earlier sessions
+solutions_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "solutions.bin")
+
+
+# the game as shown on screen, the mechanics all come from Game
+class Grid(Game):
+    def __init__(self, rows, cols, width, height, puzzle=starting_sudoku, undo_limit=10000, solutions=None):
+        super().__init__(puzzle, undo_limit, solutions)
+        self.rows = rows
+        self.cols = cols
+        self.width = width
+        self.height = height
+        # the squares are just views onto one cell of the board that know how to draw themselves
+        self.squares = [[Square(self.board, r, c) for c in range(cols)] for r in range(rows)]
+        self.buttons = [Button("Restart", 0, grid_width + 25, menu_width - 50, cell_size, white),
+                        Button("Check", 2 * cell_size, grid_width + 25, menu_width - 50, cell_size, white),
+                        Button("Undo", 4 * cell_size, grid_width + 25, menu_width - 50, cell_size, white),
+                        Button("Solve", 6 * cell_size, grid_width + 25, menu_width - 50, cell_size, white)]
+        # when this is on the status area shows the solver's counters instead
+        self.show_stats = False
+
+    # functions relating to GUI
+    # the squares and buttons are drawn by the renderer, which only redraws the
+    # ones that have changed since the last frame
+    def draw_lines(self, win):
+        for r in range(self.rows + 1):
+            # draws thicker lines for the 3x3 boxes outlines
+            if r % 3 == 0:
+                pg.draw.line(win, black, (0, r * cell_size), (grid_width, r * cell_size), 2)
+                pg.draw.line(win, black, (r * cell_size, 0), (r * cell_size, grid_width), 2)
+            else:
+                pg.draw.line(win, black, (0, r * cell_size), (grid_width, r * cell_size))
+                pg.draw.line(win, black, (r * cell_size, 0), (r * cell_size, grid_width))
+
+    # all of this below is to show the time
+    def draw_timer(self, renderer, time):
+        win = renderer.win
+        pg.draw.rect(win, white, timer_rect)
+        pg.draw.rect(win, black, timer_rect, 1)
+        text = renderer.text(time, 24, black)
+        text_width = text.get_rect().width
+        text_height = text.get_rect().height
+        win.blit(text, (timer_rect.left + (timer_rect.width - text_width) // 2,
+                        timer_rect.top + (timer_rect.height - text_height) // 2))
+
+    # shows a couple of lines of text under the solve button, like how far a
+    # background solve has got or what the last hint was
+    def draw_status(self, renderer, lines):
+        win = renderer.win
+        pg.draw.rect(win, white, status_rect)
+        for i, line in enumerate(lines):
+            text = renderer.text(line, 16, black)
+            win.blit(text, (status_rect.left + (status_rect.width - text.get_rect().width) // 2,
+                            status_rect.top + (status_rect.height - len(lines) * 20) // 2 + i * 20))
+
+    # the lines shown in the status area: the solver's counters if they've been
+    # turned on, otherwise the progress of a running solve or the last hint
+    def status_lines(self):
+        job = self.solve_job
+        if self.show_stats:
+            stats = job.stats() if job else self.solve_stats
+            if stats:
+                return ("Nodes " + str(stats["nodes"]) + "  Depth " + str(stats["max_depth"]),
+                        "Backtracks " + str(stats["backtracks"]) + "  Props " + str(stats["propagations"]),
+                        "Time %.1fms" % (stats["time"] * 1000))
+            return ("No search run",)
+        if job:
+            return ("Nodes: " + str(job.nodes), "Depth: " + str(job.depth))
+        return self.hint_text
+
+# a square doesn't store anything itself, it reads and writes its cell of the board
+class Square:
+    __slots__ = ("board", "row", "col")
+
+    def __init__(self, board, row, col):
+        self.board = board
+        self.row = row
+        self.col = col
+
+    # starting value ensures the user can't change the original vales in the squares.
+    @property
+    def starting_value(self):
+        return int(self.board.starting[self.row, self.col])
+
+    @property
+    def temp_value(self):
+        return int(self.board.values[self.row, self.col])
+
+    @temp_value.setter
+    def temp_value(self, value):
+        self.board.set_value(self.row, self.col, value)
+
+    # These are different types of markings players use for potential numbers in a squares.
+    @property
+    def corner_values(self):
+        return mask_digits(int(self.board.corner[self.row, self.col]))
+
+    @property
+    def centre_values(self):
+        return mask_digits(int(self.board.centre[self.row, self.col]))
+
+    # these 2 will highlight the squares if they are true
+    @property
+    def selected(self):
+        return bool(self.board.selected[self.row, self.col])
+
+    @selected.setter
+    def selected(self, value):
+        self.board.selected[self.row, self.col] = value
+
+    @property
+    def incorrect(self):
+        return bool(self.board.incorrect[self.row, self.col])
+
+    @incorrect.setter
+    def incorrect(self, value):
+        self.board.incorrect[self.row, self.col] = value
+
+    @property
+    def hint(self):
+        return bool(self.board.hint[self.row, self.col])
+
+    # true while the value clashes with another in the same row, column or box
+    @property
+    def conflict(self):
+        return bool(self.board.cells["conflict"][self.row, self.col])
+
+    # draws each of the squares
+    def draw(self, renderer):
+        win = renderer.win
+        # used with the check function
+        if self.incorrect:
+            pg.draw.rect(win, red, (self.col * cell_size, self.row * cell_size, cell_size, cell_size))
+
+        # squares that are part of the last hint
+        if self.hint:
+            pg.draw.rect(win, light_blue, (self.col * cell_size, self.row * cell_size, cell_size, cell_size))
+
+        # highlights the cell the player is clicked on
+        if self.selected:
+            pg.draw.rect(win, yellow, (self.col * cell_size, self.row * cell_size, cell_size, cell_size))
+
+        # the values the user has inputted are a different colour to the starting values
+        # so that the user knows which ones they have inputted. Values that clash with
+        # another are shown in red as soon as they are typed, unless the check button
+        # has already turned the square red
+        clashing = self.conflict and not self.incorrect
+        if self.starting_value != 0:
+            text = renderer.glyph(str(self.starting_value), 48, red if clashing else grey)
+            win.blit(text, ((self.col + 1 / 4) * cell_size, (self.row + 1 / 6) * cell_size))
+        elif self.temp_value == 0:
+            if self.corner_values:
+                corner_values = ''.join(str(i) for i in self.corner_values)
+                text = renderer.glyph(corner_values, 16, blue)
+                # the 1/10 adds a bit of space between the values and the borders of the cells
+                win.blit(text, ((self.col + 1 / 10) * cell_size, (self.row + 1 / 10) * cell_size))
+            if self.centre_values:
+                centre_values = ''.join(str(i) for i in self.centre_values)
+                text = renderer.glyph(centre_values, 16, red)
+                text_width = text.get_rect().width
+                text_height = text.get_rect().height
+                win.blit(text, ((self.col + 1 / 2) * cell_size - text_width // 2,
+                                (self.row + 1 / 2) * cell_size - text_height // 2))
+        else:
+            text = renderer.glyph(str(self.temp_value), 48, red if clashing else black)
+            win.blit(text, ((self.col + 1 / 4) * cell_size, (self.row + 1 / 6) * cell_size))
+
+
+class Button:
+    def __init__(self, text, top_loc, left_loc, width, height, colour):
+        self.text = text
+        self.top_loc = top_loc
+        self.left_loc = left_loc
+        self.width = width
+        self.height = height
+        self.colour = colour
+        self.selected = False
+        self.rect = pg.Rect(left_loc, top_loc, width, height)
+
+    # everything that changes how the button looks, the renderer redraws it when this changes
+    def state(self):
+        return self.text, self.colour, self.selected
+
+    def draw(self, renderer):
+        win = renderer.win
+        # these are used with the restart and solve functions to avoid misclicks
+        text = "You Sure?" if self.selected else self.text
+        colour = red if self.selected else self.colour
+
+        pg.draw.rect(win, colour, self.rect)
+        pg.draw.rect(win, black, self.rect, 1)
+        text = renderer.glyph(text, 24, black)
+        text_width = text.get_rect().width
+        text_height = text.get_rect().height
+        win.blit(text, (self.left_loc + (self.width - text_width) // 2,
+                        self.top_loc + (self.height - text_height) // 2))
+
+
+# keeps the fonts and the pieces of text that come up again and again, and
+# remembers what was on screen last frame so only the parts of the window that changed get redrawn
+class Renderer:
+    def __init__(self, win):
+        self.win = win
+        # looking up a system font is slow, so each size is only loaded once
+        self.fonts = {size: pg.font.SysFont("Arial", size) for size in (16, 24, 48)}
+        # digits, marks and button labels. There are only so many of them, unlike
+        # the clock and status lines, which are rendered each time with text
+        self.glyphs = {}
+        for digit in range(1, 10):
+            self.glyph(str(digit), 48, grey)
+            self.glyph(str(digit), 48, black)
+        self.drawn_cells = None
+        self.drawn_buttons = {}
+        self.drawn_time = None
+        self.drawn_status = None
+
+    def glyph(self, text, size, colour):
+        key = (text, size, colour)
+        surface = self.glyphs.get(key)
+        if surface is None:
+            surface = self.fonts[size].render(text, True, colour)
+            self.glyphs[key] = surface
+        return surface
+
+    def text(self, text, size, colour):
+        return self.fonts[size].render(text, True, colour)
+
+    # forces the next draw to repaint the whole window
+    def invalidate(self):
+        self.drawn_cells = None
+
+    # draws whatever changed since the last call and returns the rectangles that
+    # need pushing to the display
+    def draw(self, grid):
+        board = grid.board
+        rects = []
+        if self.drawn_cells is None:
+            self.win.fill(white)
+            for row in grid.squares:
+                for square in row:
+                    square.draw(self)
+            grid.draw_lines(self.win)
+            self.drawn_buttons = {}
+            self.drawn_time = None
+            self.drawn_status = None
+            rects.append(self.win.get_rect())
+        else:
+            # comparing the board with the copy taken last frame finds every square
+            # whose value, marks or highlighting changed in one go
+            for r, c in zip(*np.nonzero(board.cells != self.drawn_cells)):
+                rect = pg.Rect(c * cell_size, r * cell_size, cell_size, cell_size)
+                # the grid lines are redrawn clipped to the square, so the lines
+                # around it come out exactly as they would in a full redraw
+                self.win.set_clip(rect)
+                self.win.fill(white, rect)
+                grid.squares[r][c].draw(self)
+                grid.draw_lines(self.win)
+                rects.append(rect)
+            self.win.set_clip(None)
+        self.drawn_cells = board.snapshot()
+
+        for button in grid.buttons:
+            state = button.state()
+            if self.drawn_buttons.get(button) != state:
+                button.draw(self)
+                self.drawn_buttons[button] = state
+                rects.append(button.rect)
+
+        time = format_time(grid.time // 1000)
+        if time != self.drawn_time:
+            grid.draw_timer(self, time)
+            self.drawn_time = time
+            rects.append(timer_rect)
+
+        status = grid.status_lines()
+        if status != self.drawn_status:
+            grid.draw_status(self, status)
+            self.drawn_status = status
+            rects.append(status_rect)
+        return rects
+
+
+def update_screen(renderer, grid):
+    rects = renderer.draw(grid)
+    if rects:
+        pg.display.update(rects)
+
+
+def format_time(seconds):
+    # every multiple of 3600 seconds is an hour
+    hours = seconds // (60 * 60)
+    seconds %= (60 * 60)
+    # every multiple of 60 seconds is a minute
+    minutes = seconds // 60
+    seconds %= 60
+
+    hour_str = "0" + str(hours) if hours < 10 else str(hours)
+    minute_str = "0" + str(minutes) if minutes < 10 else str(minutes)
+    seconds_str = "0" + str(seconds) if seconds < 10 else str(seconds)
+
+    return hour_str + ":" + minute_str + ":" + seconds_str
+
+
+def main(args=()):
+    # a puzzle can be opened from a file with: python main.py puzzles.txt [index]
+    puzzle = starting_sudoku
+    if args:
+        index = int(args[1]) if len(args) > 1 else 0
+        puzzle = load_puzzle(args[0], index)
+    pg.init()
+    pg.font.init()
+    win = pg.display.set_mode((window_width, window_height))
+    pg.display.set_caption("Sudoku")
+    # only the events handled below are let into the queue, so moving the mouse or
+    # the window doesn't wake the loop up for a redraw and a save that do nothing
+    pg.event.set_blocked(None)
+    pg.event.set_allowed([pg.QUIT, pg.MOUSEBUTTONDOWN, KEYDOWN, KEYUP, pg.VIDEOEXPOSE, clock_event])
+    renderer = Renderer(win)
+    pool = PuzzlePool(pool_directory)
+    grid = Grid(9, 9, grid_width, grid_height, puzzle, solutions=SolutionCache(path=solutions_path))
+    # carries on from where the last game was closed, unless a puzzle was asked for
+    record = None if args else read_session(session_path)
+    if record is not None:
+        restore_session(grid, record)
+    autosave = Autosave(session_path, grid.history.capacity)
+    time_offset = grid.time
+    [restart_button, check_button, undo_button, solve_button] = [grid.buttons[i] for i in range(4)]
+    # the buttons each fill one row of cells in the menu, so the row a click is in
+    # says which button it could be
+    button_rows = {button.top_loc // cell_size: button for button in grid.buttons}
+    update_screen(renderer, grid)
+    square_list = []
+    current_square = ()
+    shift_pressed = False
+    ctrl_pressed = False
+    row = 0
+    col = 0
+    while True:
+        # sleeps until something happens, then takes everything else that's waiting
+        # so a burst of input is handled with a single redraw
+        events = [pg.event.wait()] + pg.event.get()
+        for event in events:
+            if event.type == pg.QUIT:
+                autosave.close(grid)
+                pg.quit()
+                sys.exit()
+            # the window was covered up and has to be painted again
+            if event.type == pg.VIDEOEXPOSE:
+                renderer.invalidate()
+            if event.type == pg.MOUSEBUTTONDOWN:
+                pos = event.pos
+                # highlights the cell the user clicked on, and clears the highlight of the previous cell
+                grid.reset_highlights()
+                # holding ctrl allows the user to highlight and input in more than one
+                # square at a time
+                if current_square and not ctrl_pressed:
+                    grid.deselect_all()
+                    square_list = []
+                    current_square = ()
+                if pos[0] < grid_width and pos[1] < grid_height:
+                    row = pos[1] // cell_size
+                    col = pos[0] // cell_size
+                    current_square = (row, col)
+                    square_list.append(current_square)
+                    grid.squares[row][col].selected = True
+                clicked = button_rows.get(pos[1] // cell_size)
+                if clicked and not clicked.rect.collidepoint(pos):
+                    clicked = None
+                if clicked is restart_button:
+                    if restart_button.selected:
+                        grid.restart_game()
+                        time_offset = grid.time - pg.time.get_ticks()
+                    restart_button.selected = not restart_button.selected
+                else:
+                    restart_button.selected = False
+                if clicked is check_button:
+                    if grid.check_board():
+                        check_button.text = "Well Done!!"
+                        check_button.colour = green
+                    else:
+                        check_button.text = "Not Quite"
+                        check_button.colour = red
+                else:
+                    check_button.text = "Check"
+                    check_button.colour = white
+                if clicked is undo_button:
+                    grid.undo_action()
+                if clicked is solve_button:
+                    if grid.solve_job:
+                        # while a solve is running the button cancels it instead
+                        grid.cancel_solve()
+                    else:
+                        if solve_button.selected:
+                            # a puzzle that's been solved before is filled in straight away
+                            if grid.start_solve():
+                                solve_button.text = "Cancel"
+                        solve_button.selected = not solve_button.selected
+                else:
+                    solve_button.selected = False
+            if event.type == KEYDOWN:
+                # escape cancels a solve that is running in the background
+                if event.key == K_ESCAPE:
+                    grid.cancel_solve()
+                # pressing d shows or hides the solver's counters
+                if event.key == K_d:
+                    grid.show_stats = not grid.show_stats
+                key = key_dic.get(event.key)
+                # these work whether a square is selected or not
+                if key == "z":
+                    # pressing z undoes your last input
+                    grid.undo_action()
+                elif key == "y":
+                    # pressing y redoes the last input you undid
+                    grid.redo_action()
+                elif key == "a":
+                    # pressing a turns automatic candidates on or off
+                    grid.toggle_auto_candidates()
+                elif key == "h":
+                    # pressing h highlights the next logical step
+                    grid.show_hint()
+                elif key == "n":
+                    # pressing n starts a new sudoku from the puzzle pool, with nothing
+                    # selected and the clock back at zero
+                    grid.new_game(new_puzzle(pool))
+                    square_list = []
+                    current_square = ()
+                    time_offset = grid.time - pg.time.get_ticks()
+                elif key is not None and current_square:
+                    squares = [grid.squares[r][c] for r, c in square_list]
+                    # only adds the action to the log if they are actually changing the value in the square
+                    # the edits to all the selected squares are grouped so that they
+                    # are undone with a single press
+                    if key in [1, 2, 3, 4, 5, 6, 7, 8, 9]:
+                        with grid.history.group():
+                            for loc, square in zip(square_list, squares):
+                                if square.starting_value == 0:
+                                    if ctrl_pressed and square.temp_value == 0:
+                                        grid.perform_action(Centre(loc, key))
+                                    elif shift_pressed and square.temp_value == 0:
+                                        grid.perform_action(Corner(loc, key))
+                                    elif square.temp_value != key and not ctrl_pressed and not shift_pressed:
+                                        grid.perform_action(Actions(loc, key))
+                    elif key == "delete":
+                        with grid.history.group():
+                            for loc, square in zip(square_list, squares):
+                                if square.temp_value == 0:
+                                    grid.perform_action(ClearMarks(loc))
+                                else:
+                                    grid.perform_action(Actions(loc, 0))
+                    elif key in arrow_dic:
+                        # moves the highlight one square, the mod 9 wraps it round to
+                        # the other side of the grid from the edges
+                        squares[0].selected = False
+                        row = (row + arrow_dic[key][0]) % 9
+                        col = (col + arrow_dic[key][1]) % 9
+                        grid.squares[row][col].selected = True
+                        current_square = (row, col)
+                        square_list = [current_square]
+                    elif key == "left_shift":
+                        # holding shift allows the corner values to be changed
+                        shift_pressed = True
+                    elif key == "left_ctrl":
+                        # holding ctrl allows the centre values to be changed
+                        ctrl_pressed = True
+            if event.type == KEYUP:
+                if event.key == K_LSHIFT:
+                    shift_pressed = False
+                elif event.key == K_LCTRL:
+                    ctrl_pressed = False
+
+        grid.time = time_offset + pg.time.get_ticks()
+        if grid.finish_solve():
+            solve_button.text = "Solve"
+        update_screen(renderer, grid)
+        autosave.save(grid)
+        # wakes up again when the clock is due to tick over, or sooner to show how
+        # a running solve is getting on
+        delay = 1000 - grid.time % 1000
+        if grid.solve_job:
+            delay = min(delay, solve_progress_interval)
+        pg.time.set_timer(clock_event, delay, 1)
@@ -0,0 +1,232 @@
+from collections import namedtuple
+from itertools import combinations
+
+from .solver import (ALL_DIGITS, BIT_DIGIT, BOX_CELLS, CELL_BOX, CELL_COL, CELL_ROW, COL_CELLS, POPCOUNT, ROW_CELLS,
+                     UNITS, digit_bit, flatten_puzzle, mask_digits)
+
+# one deduction. cells are the cells that make up the pattern, placements is a list
+# of (cell, digit) and eliminations a list of (cell, bitmask of digits removed).
+# Cells are numbered 0-80.
+Step = namedtuple("Step", ["technique", "cells", "placements", "eliminations"])
+
+PEERS = [sorted({j for unit in UNITS if i in unit for j in unit} - {i}) for i in range(81)]
+PEER_SETS = [set(peers) for peers in PEERS]
+
+
+def cell_name(cell):
+    return "r" + str(cell // 9 + 1) + "c" + str(cell % 9 + 1)
+
+
+# a short description of what a step does, like "r1c3 = 5" or "r2c7 not 4"
+def describe(step):
+    if step.placements:
+        cell, digit = step.placements[0]
+        return cell_name(cell) + " = " + str(digit)
+    cell, mask = step.eliminations[0]
+    return cell_name(cell) + " not " + "".join(str(d) for d in mask_digits(mask))
+
+
+# the candidates of every cell worked out from the placed digits alone
+def basic_candidates(values):
+    rows = [0] * 9
+    cols = [0] * 9
+    boxes = [0] * 9
+    for i, value in enumerate(values):
+        if value:
+            bit = digit_bit(value)
+            rows[CELL_ROW[i]] |= bit
+            cols[CELL_COL[i]] |= bit
+            boxes[CELL_BOX[i]] |= bit
+    return [0 if values[i] else ALL_DIGITS & ~(rows[CELL_ROW[i]] | cols[CELL_COL[i]] | boxes[CELL_BOX[i]])
+            for i in range(81)]
+
+
+# turns a list of (cell, digit) removals into a Step, or None if nothing would go
+def eliminate(technique, cells, removals, candidates):
+    eliminations = {}
+    for cell, bit in removals:
+        if candidates[cell] & bit:
+            eliminations[cell] = eliminations.get(cell, 0) | bit
+    if not eliminations:
+        return None
+    return Step(technique, sorted(cells), [], sorted(eliminations.items()))
+
+
+# the techniques, cheapest first. Each one looks at the shared candidate masks and
+# returns the first deduction it finds, or None.
+
+def naked_single(values, candidates):
+    for i in range(81):
+        if values[i] == 0 and POPCOUNT[candidates[i]] == 1:
+            return Step("Naked single", [i], [(i, BIT_DIGIT[candidates[i]])], [])
+    return None
+
+
+def hidden_single(values, candidates):
+    for unit in UNITS:
+        once = 0
+        twice = 0
+        for i in unit:
+            twice |= once & candidates[i]
+            once |= candidates[i]
+        hidden = once & ~twice
+        if hidden:
+            bit = hidden & -hidden
+            for i in unit:
+                if candidates[i] & bit:
+                    return Step("Hidden single", [i], [(i, BIT_DIGIT[bit])], [])
+    return None
+
+
+# a digit that can only go in one row or column of a box can't go anywhere else in
+# that row or column (pointing). A digit that can only go in one box of a row or
+# column can't go anywhere else in that box (claiming).
+def locked_candidates(technique, bases, covers_of, values, candidates):
+    for base in bases:
+        for d in range(1, 10):
+            bit = digit_bit(d)
+            cells = [i for i in base if candidates[i] & bit]
+            if len(cells) < 2:
+                continue
+            for cover_of in covers_of:
+                cover = cover_of(cells[0])
+                if cover is not base and all(cover_of(i) is cover for i in cells):
+                    step = eliminate(technique, cells, [(i, bit) for i in cover if i not in cells], candidates)
+                    if step:
+                        return step
+    return None
+
+
+def pointing(values, candidates):
+    return locked_candidates("Pointing", BOX_CELLS,
+                             (lambda i: ROW_CELLS[CELL_ROW[i]], lambda i: COL_CELLS[CELL_COL[i]]), values, candidates)
+
+
+def claiming(values, candidates):
+    return locked_candidates("Claiming", ROW_CELLS + COL_CELLS, (lambda i: BOX_CELLS[CELL_BOX[i]],),
+                             values, candidates)
+
+
+# n cells in a unit that only have n candidates between them: those digits can't go
+# anywhere else in the unit
+def naked_subset(size, technique, values, candidates):
+    for unit in UNITS:
+        open_cells = [i for i in unit if values[i] == 0 and 2 <= POPCOUNT[candidates[i]] <= size]
+        for cells in combinations(open_cells, size):
+            union = 0
+            for i in cells:
+                union |= candidates[i]
+            if POPCOUNT[union] == size:
+                removals = [(i, union) for i in unit if i not in cells and values[i] == 0]
+                step = eliminate(technique, cells, removals, candidates)
+                if step:
+                    return step
+    return None
+
+
+# n digits that can only go in the same n cells of a unit: those cells can't be
+# anything else
+def hidden_subset(size, technique, values, candidates):
+    for unit in UNITS:
+        places = {}
+        for d in range(1, 10):
+            bit = digit_bit(d)
+            cells = [i for i in unit if candidates[i] & bit]
+            if 2 <= len(cells) <= size:
+                places[bit] = cells
+        for bits in combinations(places, size):
+            cells = set()
+            for bit in bits:
+                cells.update(places[bit])
+            if len(cells) == size:
+                keep = sum(bits)
+                step = eliminate(technique, cells, [(i, ALL_DIGITS & ~keep) for i in cells], candidates)
+                if step:
+                    return step
+    return None
+
+
+# a digit whose places in n rows all fall in the same n columns can't go anywhere
+# else in those columns (and the same the other way round). X-wing is n = 2,
+# swordfish n = 3.
+def fish(size, technique, values, candidates):
+    for bases, covers in ((ROW_CELLS, COL_CELLS), (COL_CELLS, ROW_CELLS)):
+        for d in range(1, 10):
+            bit = digit_bit(d)
+            # for each base line, a mask of which cover lines the digit can go in
+            lines = []
+            for b, base in enumerate(bases):
+                positions = 0
+                for k, i in enumerate(base):
+                    if candidates[i] & bit:
+                        positions |= 1 << k
+                if 2 <= POPCOUNT[positions] <= size:
+                    lines.append((b, positions))
+            for chosen in combinations(lines, size):
+                union = 0
+                for b, positions in chosen:
+                    union |= positions
+                if POPCOUNT[union] != size:
+                    continue
+                base_cells = {i for b, positions in chosen for i in bases[b]}
+                cover_cells = [i for k in range(9) if union >> k & 1 for i in covers[k]]
+                pattern = [i for i in base_cells if candidates[i] & bit]
+                step = eliminate(technique, pattern, [(i, bit) for i in cover_cells if i not in base_cells],
+                                 candidates)
+                if step:
+                    return step
+    return None
+
+
+# a cell with candidates xy that sees a cell with xz and a cell with yz: whichever
+# the first cell is, one of the other two must be z, so anything seeing both can't be z
+def xy_wing(values, candidates):
+    pairs = [i for i in range(81) if values[i] == 0 and POPCOUNT[candidates[i]] == 2]
+    for pivot in pairs:
+        xy = candidates[pivot]
+        wings = [i for i in PEERS[pivot] if POPCOUNT[candidates[i]] == 2 and POPCOUNT[candidates[i] & xy] == 1]
+        for first, second in combinations(wings, 2):
+            z = candidates[first] & candidates[second] & ~xy
+            if not z or (candidates[first] | candidates[second]) & xy != xy or candidates[first] == candidates[second]:
+                continue
+            seen = PEER_SETS[first] & PEER_SETS[second]
+            step = eliminate("XY-wing", [pivot, first, second], [(i, z) for i in seen if i != pivot], candidates)
+            if step:
+                return step
+    return None
+
+
+TECHNIQUES = [
+    naked_single,
+    hidden_single,
+    pointing,
+    claiming,
+    lambda values, candidates: naked_subset(2, "Naked pair", values, candidates),
+    lambda values, candidates: hidden_subset(2, "Hidden pair", values, candidates),
+    lambda values, candidates: naked_subset(3, "Naked triple", values, candidates),
+    lambda values, candidates: hidden_subset(3, "Hidden triple", values, candidates),
+    lambda values, candidates: fish(2, "X-wing", values, candidates),
+    xy_wing,
+    lambda values, candidates: fish(3, "Swordfish", values, candidates),
+]
+
+
+# returns the cheapest deduction that can be made next, or None if none of the
+# techniques find anything. candidates can be given as 81 bitmasks (for example
+# the player's pencil marks, so earlier eliminations are taken into account),
+# otherwise they're worked out from the placed digits.
+def next_step(puzzle, candidates=None):
+    values = flatten_puzzle(puzzle)
+    basic = basic_candidates(values)
+    if candidates is None:
+        candidates = basic
+    else:
+        candidates = [int(mask) & basic[i] for i, mask in enumerate(flatten_puzzle(candidates))]
+    # a cell with no candidates left means there is a mistake, so nothing can be deduced
+    if any(values[i] == 0 and candidates[i] == 0 for i in range(81)):
+        return None
+    for technique in TECHNIQUES:
+        step = technique(values, candidates)
+        if step:
+            return step
+    return None
@@ -0,0 +1,97 @@
+from contextlib import contextmanager
+
+import numpy as np
+
+# every edit is stored as one packed 32 bit delta:
+#   bits 0-6   the cell, 0-80
+#   bits 7-8   what was changed (VALUE, CORNER or CENTRE from board.py)
+#   bits 9-17  the old value or mark bitmask
+#   bits 18-26 the new value or mark bitmask
+#   bit 27     set when the delta belongs to the same group as the one before it
+CELL_BITS = 0x7F
+KIND_SHIFT = 7
+OLD_SHIFT = 9
+NEW_SHIFT = 18
+VALUE_BITS = 0x1FF
+JOINED = 1 << 27
+
+
+def pack_delta(cell, kind, old, new, joined=False):
+    return cell | kind << KIND_SHIFT | old << OLD_SHIFT | new << NEW_SHIFT | (JOINED if joined else 0)
+
+
+# returns (cell, kind, old, new)
+def unpack_delta(delta):
+    return (delta & CELL_BITS, delta >> KIND_SHIFT & 3,
+            delta >> OLD_SHIFT & VALUE_BITS, delta >> NEW_SHIFT & VALUE_BITS)
+
+
+# undo and redo history kept in a fixed size ring buffer of packed deltas. Once
+# it is full the oldest edits are forgotten, so a long session never uses more
+# than capacity * 4 bytes. Positions are counted from the start of the session and
+# wrapped into the buffer with % capacity.
+class History:
+    def __init__(self, capacity=10000):
+        self.capacity = capacity
+        self.deltas = np.zeros(capacity, dtype=np.uint32)
+        # everything from first to cursor can be undone, from cursor to last redone
+        self.first = 0
+        self.cursor = 0
+        self.last = 0
+        self.group_depth = 0
+        self.group_size = 0
+
+    def __len__(self):
+        return self.cursor - self.first
+
+    def clear(self):
+        self.first = self.cursor = self.last = 0
+
+    # every edit recorded inside the with block is undone and redone as one step.
+    # Groups can be nested, only the outermost one counts.
+    @contextmanager
+    def group(self):
+        if self.group_depth == 0:
+            self.group_size = 0
+        self.group_depth += 1
+        try:
+            yield
+        finally:
+            self.group_depth -= 1
+
+    def record(self, cell, kind, old, new):
+        joined = self.group_depth > 0 and self.group_size > 0
+        self.group_size += 1
+        # a new edit means the undone ones can't be redone any more
+        self.last = self.cursor
+        if self.cursor - self.first == self.capacity:
+            # full, so drop the oldest group to make room
+            self.first += 1
+            while self.first < self.cursor and self.deltas[self.first % self.capacity] & JOINED:
+                self.first += 1
+        self.deltas[self.cursor % self.capacity] = pack_delta(cell, kind, old, new, joined)
+        self.cursor += 1
+        self.last = self.cursor
+
+    # steps back over the last group and returns its deltas, newest first, so they
+    # can be reverted in that order. Returns an empty list if there is nothing to undo.
+    def undo(self):
+        undone = []
+        while self.cursor > self.first:
+            self.cursor -= 1
+            delta = int(self.deltas[self.cursor % self.capacity])
+            undone.append(unpack_delta(delta))
+            if not delta & JOINED:
+                break
+        return undone
+
+    # steps forward over the next group and returns its deltas, oldest first
+    def redo(self):
+        redone = []
+        while self.cursor < self.last:
+            delta = int(self.deltas[self.cursor % self.capacity])
+            if redone and not delta & JOINED:
+                break
+            redone.append(unpack_delta(delta))
+            self.cursor += 1
+        return redone
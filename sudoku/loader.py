@@ -0,0 +1,157 @@
+import csv
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from .batch import solve_chunk
+
+PUZZLE_CHARS = set(".0123456789")
+
+
+def is_puzzle(text):
+    return len(text) == 81 and set(text) <= PUZZLE_CHARS
+
+
+# turns an 81 character string, with "." or "0" for empty cells, into a 9x9 array
+def parse_puzzle(text):
+    text = text.strip()
+    if not is_puzzle(text):
+        raise ValueError("not a sudoku: " + repr(text))
+    return (np.frombuffer(text.replace(".", "0").encode("ascii"), dtype=np.uint8) - 48).reshape(9, 9)
+
+
+# the opposite of parse_puzzle, empty cells are written as "."
+def format_puzzle(puzzle):
+    return "".join(str(int(v)) if v else "." for v in np.asarray(puzzle).ravel())
+
+
+# one puzzle per line. Blank lines and lines starting with # are skipped, and anything
+# after the puzzle on the same line (ratings, names...) is ignored. SDM files use this
+# layout as well.
+#
+# Every reader skips lines that don't hold a puzzle rather than stopping there. If
+# skipped is a list the lines are added to it, so they can be counted or reported.
+def read_lines(file, skipped=None):
+    for line in file:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if not is_puzzle(line.split()[0]):
+            if skipped is not None:
+                skipped.append(line)
+            continue
+        yield parse_puzzle(line.split()[0])
+
+
+# the first column holds the puzzle, any other columns (usually the solution) are
+# ignored. A header row is skipped if there is one.
+def read_csv(file, skipped=None):
+    for number, fields in enumerate(csv.reader(file)):
+        if not fields:
+            continue
+        if not is_puzzle(fields[0].strip()):
+            if number and skipped is not None:
+                skipped.append(",".join(fields))
+            continue
+        yield parse_puzzle(fields[0])
+
+
+# SDK files write a puzzle as 9 rows of 9 characters. Comment lines, section headers
+# and box separators like "---+---+---" are skipped, and a file can hold more than
+# one puzzle one after the other. Lines that aren't a row of the grid are all taken
+# to be separators, so nothing is ever added to skipped.
+def read_sdk(file, skipped=None):
+    rows = []
+    for line in file:
+        line = line.strip()
+        if not line or line[0] in "#[":
+            continue
+        row = "".join(ch for ch in line if ch in PUZZLE_CHARS)
+        if len(row) != 9:
+            continue
+        rows.append(row)
+        if len(rows) == 9:
+            yield parse_puzzle("".join(rows))
+            rows = []
+
+
+READERS = {"lines": read_lines, "sdm": read_lines, "csv": read_csv, "sdk": read_sdk}
+
+
+def guess_format(path):
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    return extension if extension in READERS else "lines"
+
+
+# lazily yields every puzzle in a file as a 9x9 uint8 array. Only one line is held
+# in memory at a time, so the size of the file doesn't matter. Lines that aren't a
+# puzzle are skipped, see read_lines
+def read_puzzles(path, file_format=None, skipped=None):
+    reader = READERS[file_format or guess_format(path)]
+    with open(path, newline="") as file:
+        yield from reader(file, skipped)
+
+
+def load_puzzle(path, index=0, file_format=None):
+    puzzle = next(islice(read_puzzles(path, file_format), index, None), None)
+    if puzzle is None:
+        raise IndexError("puzzle " + str(index) + " not found in " + path)
+    return puzzle
+
+
+def chunked(puzzles, chunk_size):
+    puzzles = iter(puzzles)
+    while True:
+        chunk = list(islice(puzzles, chunk_size))
+        if not chunk:
+            return
+        yield np.stack(chunk)
+
+
+# solves every puzzle in source and writes each one with its solution to destination
+# as it goes, leaving the solution out for puzzles that can't be solved. A .csv
+# destination gets "puzzle,solution" rows under a header, anything else gets a
+# "puzzle solution" line per puzzle, so either can be read back with read_puzzles
+# (a destination ending in .sdk needs file_format="lines"). Only a couple of chunks
+# per worker are ever in flight, so memory use stays the same no matter how big
+# the file is.
+# Returns the number of puzzles, how many of them were solved and how many lines
+# of source were skipped for not being a puzzle.
+def solve_file(source, destination, file_format=None, workers=1, chunk_size=1000, vectorized=False):
+    total = 0
+    solved = 0
+    skipped = []
+    separator = "," if guess_format(destination) == "csv" else " "
+    with open(destination, "w", newline="") as out:
+        if separator == ",":
+            out.write("quizzes,solutions\n")
+
+        def write(chunk, result):
+            nonlocal total, solved
+            for puzzle, solution, ok in zip(chunk, result.solutions, result.solved):
+                out.write(format_puzzle(puzzle) + (separator + format_puzzle(solution) if ok else "") + "\n")
+            total += len(chunk)
+            solved += int(result.solved.sum())
+
+        chunks = chunked(read_puzzles(source, file_format, skipped), chunk_size)
+        if workers <= 1:
+            for chunk in chunks:
+                write(chunk, solve_chunk(chunk, vectorized))
+            return total, solved, len(skipped)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append((chunk, executor.submit(solve_chunk, chunk, vectorized)))
+                # results are written in order, waiting on the oldest chunk once
+                # enough work is queued up
+                if len(pending) >= workers * 2:
+                    chunk, future = pending.popleft()
+                    write(chunk, future.result())
+            while pending:
+                chunk, future = pending.popleft()
+                write(chunk, future.result())
+    return total, solved, len(skipped)
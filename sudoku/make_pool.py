@@ -0,0 +1,17 @@
+import argparse
+
+from .generator import DIFFICULTIES, PuzzlePool
+
+# fills a pool from the command line: python -m sudoku.make_pool pool 1000. This is
+# kept out of generator.py, which the package imports, so running it with -m doesn't
+# load the generator twice
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate sudokus into a puzzle pool")
+    parser.add_argument("directory")
+    parser.add_argument("count", type=int)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    pool = PuzzlePool(args.directory)
+    pool.fill(args.count, args.workers, args.seed)
+    print(", ".join(name + ": " + str(pool.size(name)) for name in DIFFICULTIES))
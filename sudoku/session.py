@@ -0,0 +1,107 @@
+import os
+
+import numpy as np
+
+from .board import CELL_DTYPE
+from .history import History
+
+# a saved game is one fixed size record: a header, the board's cells as they are
+# in memory and the undo history's ring buffer. Everything is little endian and
+# packed, so the file is a few hundred bytes plus 4 bytes per undo step.
+MAGIC = b"SDKS"
+VERSION = 2
+
+
+def session_dtype(capacity):
+    return np.dtype([
+        ("magic", "S4"),
+        ("version", "<u2"),
+        ("capacity", "<u4"),
+        # the history's positions, see History
+        ("first", "<u8"),
+        ("cursor", "<u8"),
+        ("last", "<u8"),
+        # milliseconds on the clock
+        ("time", "<u8"),
+        # whether automatic candidates are on
+        ("auto_candidates", "u1"),
+        ("cells", CELL_DTYPE.newbyteorder("<"), (9, 9)),
+        ("deltas", "<u4", (capacity,)),
+    ])
+
+
+# reads a saved game, returning None if there isn't one or it was written by a
+# different version
+def read_session(path):
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except OSError:
+        return None
+    header = session_dtype(0)
+    if len(data) < header.itemsize:
+        return None
+    record = np.frombuffer(data, header, count=1)[0]
+    if record["magic"] != MAGIC or record["version"] != VERSION:
+        return None
+    dtype = session_dtype(int(record["capacity"]))
+    if len(data) != dtype.itemsize:
+        return None
+    return np.frombuffer(data, dtype, count=1)[0]
+
+
+# puts a game back how it was saved. The board and history are copied in whole,
+# so nothing has to be replayed
+def restore_session(game, record):
+    game.cancel_solve()
+    game.cancel_lookup()
+    game.board.restore(record["cells"])
+    game.board.deselect_all()
+    game.board.reset_highlights()
+    history = History(int(record["capacity"]))
+    history.deltas[:] = record["deltas"]
+    history.first = int(record["first"])
+    history.cursor = int(record["cursor"])
+    history.last = int(record["last"])
+    game.history = history
+    game.hint_text = ()
+    game.time = int(record["time"])
+    game.auto_candidates = bool(record["auto_candidates"])
+
+
+# keeps a game saved to a memory mapped file. Saving just copies the board and the
+# history into the mapping and the operating system writes the pages out in its
+# own time, so it's cheap enough to do every frame.
+class Autosave:
+    def __init__(self, path, capacity):
+        self.path = path
+        self.capacity = capacity
+        # an existing file of the right size is reused, anything else is replaced
+        size = os.path.getsize(path) if os.path.exists(path) else None
+        mode = "r+" if size == session_dtype(capacity).itemsize else "w+"
+        self.file = np.memmap(path, dtype=session_dtype(capacity), mode=mode, shape=(1,))
+        self.record = self.file[0]
+        self.record["magic"] = MAGIC
+        self.record["version"] = VERSION
+        self.record["capacity"] = capacity
+
+    def save(self, game):
+        record = self.record
+        history = game.history
+        if history.capacity != self.capacity:
+            raise ValueError("the history holds " + str(history.capacity) + " steps, the file " + str(self.capacity))
+        record["deltas"] = history.deltas
+        record["first"] = history.first
+        record["cursor"] = history.cursor
+        record["last"] = history.last
+        record["cells"] = game.board.cells
+        record["time"] = game.time
+        record["auto_candidates"] = game.auto_candidates
+
+    # makes sure everything has reached the disk, used when the game is closed
+    def close(self, game=None):
+        if game is not None:
+            self.save(game)
+        self.file.flush()
+        del self.record
+        del self.file
@@ -0,0 +1,223 @@
+import time
+from itertools import islice
+
+ALL_DIGITS = 0x1FF
+
+# lookup tables so the hot loops never have to work out which row, column or
+# box a cell belongs to
+CELL_ROW = [i // 9 for i in range(81)]
+CELL_COL = [i % 9 for i in range(81)]
+CELL_BOX = [(i // 27) * 3 + (i % 9) // 3 for i in range(81)]
+
+ROW_CELLS = [[r * 9 + c for c in range(9)] for r in range(9)]
+COL_CELLS = [[r * 9 + c for r in range(9)] for c in range(9)]
+BOX_CELLS = [[(b // 3 * 3 + r) * 9 + b % 3 * 3 + c for r in range(3) for c in range(3)] for b in range(9)]
+UNITS = ROW_CELLS + COL_CELLS + BOX_CELLS
+
+# number of candidates left in a mask, and the digit a single bit stands for
+POPCOUNT = [bin(mask).count("1") for mask in range(ALL_DIGITS + 1)]
+BIT_DIGIT = {1 << (d - 1): d for d in range(1, 10)}
+
+
+def digit_bit(digit):
+    return 1 << (digit - 1)
+
+
+def mask_digits(mask):
+    return [d for d in range(1, 10) if mask & (1 << (d - 1))]
+
+
+# accepts a 9x9 nested list, a 9x9 numpy array or a flat sequence of 81 values
+# and returns a flat list of 81 ints, with 0 used for empty cells
+def flatten_puzzle(puzzle):
+    if hasattr(puzzle, "ravel"):
+        cells = [int(v) for v in puzzle.ravel()]
+    elif len(puzzle) == 9:
+        cells = [int(v) for row in puzzle for v in row]
+    else:
+        cells = [int(v) for v in puzzle]
+    if len(cells) != 81:
+        raise ValueError("a sudoku needs 81 cells, got " + str(len(cells)))
+    return cells
+
+
+class Solver:
+    def __init__(self, puzzle, trace_every=0):
+        self.puzzle = flatten_puzzle(puzzle)
+        # progress counters, these can be read from another thread while solving.
+        # nodes counts the positions searched, backtracks the ones that turned out
+        # to be dead ends and propagations the cells filled in by propagate
+        self.nodes = 0
+        self.depth = 0
+        self.max_depth = 0
+        self.backtracks = 0
+        self.propagations = 0
+        self.started = None
+        self.time = None
+        self.cancelled = False
+        # with trace_every set to n, every nth node adds a sample of
+        # (node, depth, cells filled, seconds since the start) to trace
+        self.trace_every = trace_every
+        self.trace = []
+
+    # stops the search the next time it enters a node, it then ends as if there
+    # were no more solutions. Safe to call from another thread.
+    def cancel(self):
+        self.cancelled = True
+
+    # the state used by the search is 4 plain lists: the values of the 81 cells
+    # and a bitmask per row, column and box of the digits already placed in it.
+    # The candidates for an empty cell are whatever none of its 3 units use.
+    def initial_state(self):
+        cells = [0] * 81
+        rows = [0] * 9
+        cols = [0] * 9
+        boxes = [0] * 9
+        for i, value in enumerate(self.puzzle):
+            if value:
+                if not 1 <= value <= 9:
+                    return None
+                if not self.place(cells, rows, cols, boxes, i, digit_bit(value)):
+                    # the givens already break a rule, so there can't be a solution
+                    return None
+        return cells, rows, cols, boxes
+
+    @staticmethod
+    def place(cells, rows, cols, boxes, i, bit):
+        r, c, b = CELL_ROW[i], CELL_COL[i], CELL_BOX[i]
+        if (rows[r] | cols[c] | boxes[b]) & bit:
+            return False
+        cells[i] = BIT_DIGIT[bit]
+        rows[r] |= bit
+        cols[c] |= bit
+        boxes[b] |= bit
+        return True
+
+    # fills in naked singles (a cell with one candidate) and hidden singles (a digit
+    # with one possible cell in a unit) until nothing changes. Returns False as soon
+    # as it finds a cell or unit that can't be completed.
+    def propagate(self, cells, rows, cols, boxes):
+        changed = True
+        while changed:
+            changed = False
+            for i in range(81):
+                if cells[i] == 0:
+                    candidates = ALL_DIGITS & ~(rows[CELL_ROW[i]] | cols[CELL_COL[i]] | boxes[CELL_BOX[i]])
+                    if candidates == 0:
+                        return False
+                    if POPCOUNT[candidates] == 1:
+                        self.place(cells, rows, cols, boxes, i, candidates)
+                        self.propagations += 1
+                        changed = True
+            if changed:
+                continue
+            for unit in UNITS:
+                # once collects every digit that can go somewhere in the unit, twice
+                # the ones that can go in more than one place
+                once = 0
+                twice = 0
+                placed = 0
+                for i in unit:
+                    if cells[i]:
+                        placed |= digit_bit(cells[i])
+                    else:
+                        candidates = ALL_DIGITS & ~(rows[CELL_ROW[i]] | cols[CELL_COL[i]] | boxes[CELL_BOX[i]])
+                        twice |= once & candidates
+                        once |= candidates
+                if (once | placed) != ALL_DIGITS:
+                    return False
+                hidden = once & ~twice
+                while hidden:
+                    bit = hidden & -hidden
+                    hidden ^= bit
+                    for i in unit:
+                        if cells[i] == 0 and not (rows[CELL_ROW[i]] | cols[CELL_COL[i]] | boxes[CELL_BOX[i]]) & bit:
+                            self.place(cells, rows, cols, boxes, i, bit)
+                            self.propagations += 1
+                            changed = True
+                            break
+                    else:
+                        # an earlier hidden single in this unit took the only spot
+                        return False
+        return True
+
+    # picks the empty cell with the fewest candidates, so the search branches as
+    # little as possible. Returns -1 when the board is full.
+    @staticmethod
+    def choose_cell(cells, rows, cols, boxes):
+        best = -1
+        best_count = 10
+        best_candidates = 0
+        for i in range(81):
+            if cells[i] == 0:
+                candidates = ALL_DIGITS & ~(rows[CELL_ROW[i]] | cols[CELL_COL[i]] | boxes[CELL_BOX[i]])
+                count = POPCOUNT[candidates]
+                if count < best_count:
+                    best = i
+                    best_count = count
+                    best_candidates = candidates
+                    if count <= 2:
+                        break
+        return best, best_candidates
+
+    # yields every solution as a flat list of 81 digits
+    def search(self, cells, rows, cols, boxes, depth=0):
+        if self.cancelled:
+            return
+        self.nodes += 1
+        self.depth = depth
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if self.trace_every and self.nodes % self.trace_every == 0:
+            self.trace.append((self.nodes, depth, 81 - cells.count(0), time.perf_counter() - self.started))
+        if not self.propagate(cells, rows, cols, boxes):
+            self.backtracks += 1
+            return
+        i, candidates = self.choose_cell(cells, rows, cols, boxes)
+        if i == -1:
+            yield cells
+            return
+        while candidates:
+            bit = candidates & -candidates
+            candidates ^= bit
+            # each branch works on its own copy so nothing needs undoing afterwards
+            new_cells, new_rows, new_cols, new_boxes = cells[:], rows[:], cols[:], boxes[:]
+            self.place(new_cells, new_rows, new_cols, new_boxes, i, bit)
+            yield from self.search(new_cells, new_rows, new_cols, new_boxes, depth + 1)
+
+    def solutions(self):
+        self.started = time.perf_counter()
+        state = self.initial_state()
+        if state is None:
+            return
+        yield from self.search(*state)
+
+    # returns the first solution found as a flat list of 81 digits, or None
+    def solve(self):
+        solution = next(self.solutions(), None)
+        self.time = time.perf_counter() - self.started
+        return solution
+
+    # counts the solutions, stopping once limit have been found. A limit of 2 is
+    # enough to tell whether a puzzle has exactly one solution.
+    def count_solutions(self, limit=2):
+        count = sum(1 for _ in islice(self.solutions(), limit))
+        self.time = time.perf_counter() - self.started
+        return count
+
+    # the counters as a dict. While a search is still running, time is how long it
+    # has been going so far.
+    def stats(self):
+        elapsed = self.time
+        if elapsed is None:
+            elapsed = time.perf_counter() - self.started if self.started else 0.0
+        return {"nodes": self.nodes, "backtracks": self.backtracks, "propagations": self.propagations,
+                "max_depth": self.max_depth, "time": elapsed}
+
+
+# convenience wrapper that returns the solution in the same 9x9 shape as starting_sudoku
+def solve(puzzle):
+    solution = Solver(puzzle).solve()
+    if solution is None:
+        return None
+    return [solution[r * 9:(r + 1) * 9] for r in range(9)]
@@ -0,0 +1,42 @@
+import threading
+
+from .solver import Solver
+
+
+# runs a solver on a background thread so the interface keeps responding while it
+# searches. The interface polls done() each frame and reads nodes and depth to show
+# how far the search has got.
+class SolveJob:
+    def __init__(self, puzzle):
+        self.puzzle = puzzle
+        self.solver = Solver(puzzle)
+        self.solution = None
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def run(self):
+        self.solution = self.solver.solve()
+
+    def cancel(self):
+        self.solver.cancel()
+
+    def done(self):
+        return not self.thread.is_alive()
+
+    @property
+    def cancelled(self):
+        return self.solver.cancelled
+
+    @property
+    def nodes(self):
+        return self.solver.nodes
+
+    @property
+    def depth(self):
+        return self.solver.depth
+
+    def stats(self):
+        return self.solver.stats()
@@ -0,0 +1,37 @@
+import numpy as np
+
+from sudoku import Solver, solve_many
+from sudoku.batch import as_puzzle_array, solve_vectorized
+from sudoku.game import starting_sudoku
+from sudoku.loader import parse_puzzle
+
+
+def test_digits_outside_the_range_are_not_wrapped():
+    puzzles = np.stack([starting_sudoku] * 4).astype(np.int64)
+    puzzles[1, 0, 0] = 260
+    puzzles[2, 0, 0] = 256
+    puzzles[3, 0, 0] = -1
+    assert (as_puzzle_array(puzzles)[1:, 0, 0] == 10).all()
+    for vectorized in (False, True):
+        result = solve_many(puzzles, workers=1, vectorized=vectorized)
+        assert list(result.solved) == [True, False, False, False]
+        assert not result.solutions[1:].any()
+
+
+def test_crowded_puzzles_fall_back_to_the_solver():
+    hard = parse_puzzle("8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..")
+    puzzles = np.stack([starting_sudoku.astype(np.uint8), hard])
+    solver = Solver(hard)
+    expected = solver.solve()
+    counters = (solver.nodes, solver.backtracks, solver.propagations, solver.max_depth)
+    # the hard puzzle needs more than two copies at once, so the solver takes it and
+    # its counters are the solver's
+    result = solve_vectorized(puzzles, branch_limit=2)
+    assert list(result.solved) == [True, True]
+    assert list(result.solutions[1].ravel()) == expected
+    assert tuple(result.stats[1]) == counters
+    assert result.stats[0]["nodes"] == 1
+    # with room to branch it is solved along with the rest
+    result = solve_vectorized(puzzles)
+    assert list(result.solutions[1].ravel()) == expected
+    assert tuple(result.stats[1]) != counters
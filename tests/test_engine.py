@@ -0,0 +1,193 @@
+import numpy as np
+import pytest
+
+from sudoku import Actions, ExactCoverSolver, Game, History, SolutionCache, Solver, canonical_form, next_step
+from sudoku.batch import solve_vectorized
+from sudoku.board import VALUE
+from sudoku.hints import basic_candidates
+from sudoku.loader import format_puzzle, parse_puzzle, read_puzzles, solve_file
+from sudoku.session import Autosave, read_session, restore_session
+
+EASY = "..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3.."
+HARD = "..............3.85..1.2.......5.7.....4...1...9.......5......73..2.1........4...9"
+# has no solution, but the solver takes a very long time to find that out
+IMPOSSIBLE = ".....5.8....6.1.43..........1.5........1.6...3.......553.....61........4........."
+
+
+def solution_of(text):
+    return np.array(Solver(parse_puzzle(text)).solve(), dtype=np.uint8).reshape(9, 9)
+
+
+# the same puzzle with its bands, rows, stacks and columns shuffled, the digits
+# relabelled and the grid transposed
+def shuffled(puzzle, seed):
+    rng = np.random.default_rng(seed)
+    rows = np.concatenate([3 * band + rng.permutation(3) for band in rng.permutation(3)])
+    cols = np.concatenate([3 * stack + rng.permutation(3) for stack in rng.permutation(3)])
+    relabel = np.concatenate([[0], rng.permutation(9) + 1]).astype(np.uint8)
+    return relabel[puzzle[np.ix_(rows, cols)]].T
+
+
+def test_undo_and_redo_whole_groups():
+    game = Game(parse_puzzle(EASY))
+    game.perform_action(Actions((0, 0), 4))
+    with game.history.group():
+        game.perform_action(Actions((0, 1), 8))
+        game.perform_action(Actions((0, 3), 9))
+    game.undo_action()
+    assert game.board.values[0, 0] == 4
+    assert game.board.values[0, 1] == 0 and game.board.values[0, 3] == 0
+    game.undo_action()
+    assert game.board.values[0, 0] == 0
+    game.redo_action()
+    game.redo_action()
+    assert list(game.board.values[0, [0, 1, 3]]) == [4, 8, 9]
+    # a new edit can't be followed by a redo
+    game.undo_action()
+    game.perform_action(Actions((8, 8), 1))
+    game.redo_action()
+    assert game.board.values[0, 1] == 0
+
+
+def test_full_history_forgets_the_oldest_group():
+    history = History(4)
+    history.record(0, VALUE, 0, 1)
+    with history.group():
+        history.record(1, VALUE, 0, 2)
+        history.record(2, VALUE, 0, 3)
+    history.record(3, VALUE, 0, 4)
+    history.record(4, VALUE, 0, 5)
+    assert len(history) == 4
+    # one more edit has to drop the group as well as the single edit before it
+    history.record(5, VALUE, 0, 6)
+    assert len(history) == 3
+    assert [cell for cell, kind, old, new in history.undo()] == [5]
+    assert [cell for cell, kind, old, new in history.undo()] == [4]
+    assert [cell for cell, kind, old, new in history.undo()] == [3]
+    assert history.undo() == []
+    assert [cell for cell, kind, old, new in history.redo()] == [3]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_transformed_puzzles_share_a_canonical_form(seed):
+    puzzle = parse_puzzle(HARD)
+    key, transform = canonical_form(puzzle)
+    assert canonical_form(shuffled(puzzle, seed))[0] == key
+    assert canonical_form(parse_puzzle(EASY))[0] != key
+
+
+def test_cache_answers_transformed_and_unsolvable_puzzles():
+    cache = SolutionCache()
+    puzzle = parse_puzzle(HARD)
+    cache.put(puzzle, solution_of(HARD))
+    other = shuffled(puzzle, 7)
+    solution = np.array(cache.get(other), dtype=np.uint8).reshape(9, 9)
+    assert ((other == 0) | (other == solution)).all()
+    assert Solver(solution).solve() is not None
+    impossible = parse_puzzle(IMPOSSIBLE)
+    assert cache.get(impossible) is None
+    cache.put(impossible, None)
+    assert cache.get(impossible) == []
+    assert cache.solve(impossible) is None
+
+
+def test_check_and_hint_never_search_on_the_interface_thread():
+    game = Game(parse_puzzle(IMPOSSIBLE))
+    assert not game.check_board()
+    game.show_hint()
+    assert game.lookup_job is not None
+    game.new_game(parse_puzzle(EASY))
+    assert game.lookup_job is None
+
+
+def test_vectorized_solver_matches_solver():
+    texts = [EASY, HARD, format_puzzle(shuffled(parse_puzzle(EASY), 1))]
+    puzzles = np.stack([parse_puzzle(text) for text in texts] + [parse_puzzle(EASY)])
+    # a digit out of range means no solution
+    puzzles[-1, 0, 0] = 12
+    result = solve_vectorized(puzzles)
+    assert list(result.solved) == [True, True, True, False]
+    for text, solution in zip(texts, result.solutions):
+        assert (solution == solution_of(text)).all()
+    assert not result.solutions[-1].any()
+
+
+def test_session_round_trip(tmp_path):
+    path = str(tmp_path / "session.bin")
+    game = Game(parse_puzzle(EASY), undo_limit=8)
+    game.perform_action(Actions((0, 0), 4))
+    game.perform_action(Actions((0, 1), 8))
+    game.undo_action()
+    game.auto_candidates = True
+    game.time = 12345
+    autosave = Autosave(path, 8)
+    autosave.close(game)
+
+    record = read_session(path)
+    assert record is not None
+    restored = Game(undo_limit=8)
+    restore_session(restored, record)
+    assert (restored.board.cells == game.board.cells).all()
+    assert restored.time == 12345
+    assert restored.auto_candidates
+    restored.redo_action()
+    assert restored.board.values[0, 1] == 8
+    restored.undo_action()
+    restored.undo_action()
+    assert restored.board.values[0, 0] == 0
+    assert read_session(str(tmp_path / "missing.bin")) is None
+
+
+# the hint engine can't finish the last puzzle, but every step it does find has
+# to agree with the solution
+@pytest.mark.parametrize("text, finishes", [
+    (EASY, True),
+    ("4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......", True),
+    ("8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..", False),
+])
+def test_hints_agree_with_the_solution(text, finishes):
+    values = [int(v) for v in parse_puzzle(text).ravel()]
+    solution = solution_of(text).ravel()
+    candidates = basic_candidates(values)
+    while 0 in values:
+        step = next_step(values, candidates)
+        if step is None:
+            break
+        for cell, digit in step.placements:
+            assert digit == solution[cell]
+            values[cell] = digit
+        for cell, mask in step.eliminations:
+            assert not mask >> (solution[cell] - 1) & 1
+            candidates[cell] &= ~mask
+        basic = basic_candidates(values)
+        candidates = [a & b for a, b in zip(candidates, basic)]
+    assert (0 not in values) == finishes
+    assert all(value in (0, digit) for value, digit in zip(values, solution))
+
+
+def test_exact_cover_finds_the_unique_solution():
+    assert (np.array(ExactCoverSolver(parse_puzzle(HARD)).solve()).reshape(9, 9) == solution_of(HARD)).all()
+    assert ExactCoverSolver(parse_puzzle(IMPOSSIBLE)).solve() is None
+
+
+def test_solve_file_output_reads_back(tmp_path):
+    source = tmp_path / "puzzles.txt"
+    source.write_text(EASY + "\nnot a puzzle\n" + HARD + " hard\n")
+    for name in ("solved.csv", "solved.txt"):
+        destination = str(tmp_path / name)
+        assert solve_file(str(source), destination) == (2, 2, 1)
+        assert [format_puzzle(p) for p in read_puzzles(destination)] == [EASY, HARD]
+
+
+@pytest.mark.parametrize("reset", ["restart", "new game"])
+def test_auto_candidates_survive_a_reset(reset):
+    game = Game(parse_puzzle(EASY))
+    game.toggle_auto_candidates()
+    game.perform_action(Actions((0, 0), 4))
+    if reset == "restart":
+        game.restart_game()
+    else:
+        game.new_game(parse_puzzle(HARD))
+    assert game.auto_candidates
+    assert (game.board.centre == np.where(game.board.values == 0, game.board.candidates(), 0)).all()
+    assert len(game.history) == 0
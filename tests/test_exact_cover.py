@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from sudoku import ExactCoverSolver, Shape
+
+
+# whether grid is a full solution of shape: every row, column and box (and both
+# diagonals with diagonal=True) holds each digit once and every cage adds up
+def follows_rules(grid, shape):
+    n = shape.size
+    grid = np.asarray(grid).reshape(n, n)
+    digits = list(range(1, n + 1))
+    units = [grid[r] for r in range(n)] + [grid[:, c] for c in range(n)]
+    units += [grid[r:r + shape.box_rows, c:c + shape.box_cols].ravel()
+              for r in range(0, n, shape.box_rows) for c in range(0, n, shape.box_cols)]
+    if shape.diagonal:
+        units += [grid.diagonal(), np.fliplr(grid).diagonal()]
+    cages_add_up = all(grid.flat[cells].sum() == total and len(set(grid.flat[cells])) == len(cells)
+                       for total, cells in shape.cages)
+    return all(sorted(unit) == digits for unit in units) and cages_add_up
+
+
+def test_boxes_are_as_square_as_the_size_allows():
+    assert (Shape(6).box_rows, Shape(6).box_cols) == (2, 3)
+    assert (Shape.of([0] * 16).box_rows, Shape.of([0] * 16).box_cols) == (2, 2)
+    assert (Shape(12, box_cols=4).box_rows, Shape(12, box_cols=4).box_cols) == (3, 4)
+    with pytest.raises(ValueError):
+        Shape(9, box_rows=2)
+    with pytest.raises(ValueError):
+        Shape.of([0] * 50)
+
+
+def test_solves_a_six_by_six():
+    shape = Shape(6)
+    solution = ExactCoverSolver([0] * 36, shape).solve()
+    assert follows_rules(solution, shape)
+    puzzle = list(solution)
+    puzzle[::3] = [0] * 12
+    assert ExactCoverSolver(puzzle).solve() == solution
+
+
+def test_diagonals_hold_every_digit():
+    shape = Shape(9, diagonal=True)
+    assert follows_rules(ExactCoverSolver([0] * 81, shape).solve(), shape)
+    # two ones on the main diagonal are fine in a plain puzzle but not here
+    puzzle = [0] * 81
+    puzzle[0] = puzzle[40] = 1
+    assert ExactCoverSolver(puzzle).solve() is not None
+    assert ExactCoverSolver(puzzle, shape).solve() is None
+
+
+def test_killer_cages_add_up():
+    # a 4x4 split into eight dominoes, with the totals of one solution
+    grid = [1, 2, 3, 4,
+            3, 4, 1, 2,
+            2, 1, 4, 3,
+            4, 3, 2, 1]
+    dominoes = [[r * 4 + c, r * 4 + c + 1] for r in range(4) for c in (0, 2)]
+    shape = Shape(4, cages=[(grid[a] + grid[b], [a, b]) for a, b in dominoes])
+    solver = ExactCoverSolver([0] * 16, shape)
+    for solution in solver.solutions():
+        assert follows_rules(solution, shape)
+    assert ExactCoverSolver([0] * 16, shape).solve() is not None
+    # no two different digits up to 4 add up to 8
+    impossible = Shape(4, cages=[(8, [0, 1])])
+    assert ExactCoverSolver([0] * 16, impossible).solve() is None
+
+
+def test_counts_solutions_up_to_the_limit():
+    assert ExactCoverSolver([0] * 16).count_solutions(limit=5) == 5
+    assert ExactCoverSolver([0] * 16).count_solutions(limit=1000) == 288
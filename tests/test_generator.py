@@ -0,0 +1,22 @@
+import random
+
+import numpy as np
+
+from sudoku import ExactCoverSolver, PuzzlePool, grade, make_puzzle
+from sudoku.generator import DIFFICULTIES
+
+
+def test_made_puzzles_have_one_solution():
+    for seed in range(3):
+        puzzle = make_puzzle(random.Random(seed))
+        assert 17 <= np.count_nonzero(puzzle) < 81
+        assert ExactCoverSolver(puzzle).count_solutions(2) == 1
+        assert grade(puzzle) in DIFFICULTIES
+
+
+def test_pool_hands_out_what_was_added(tmp_path):
+    pool = PuzzlePool(str(tmp_path))
+    puzzle = make_puzzle(random.Random(5))
+    pool.add([("".join(str(v) for v in puzzle), "easy")])
+    assert pool.size() == 1
+    assert (pool.take("easy").ravel() == puzzle).all()
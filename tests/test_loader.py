@@ -0,0 +1,39 @@
+import pytest
+
+from sudoku import load_puzzle, read_puzzles
+from sudoku.loader import format_puzzle
+
+EASY = "..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3.."
+HARD = "..............3.85..1.2.......5.7.....4...1...9.......5......73..2.1........4...9"
+
+
+def test_csv_takes_the_first_column_and_skips_the_header(tmp_path):
+    path = tmp_path / "puzzles.csv"
+    path.write_text("quizzes,solutions\n" + EASY + ",\n\n" + HARD.replace(".", "0") + ",something\nbroken,row\n")
+    skipped = []
+    assert [format_puzzle(p) for p in read_puzzles(str(path), skipped=skipped)] == [EASY, HARD]
+    assert skipped == ["broken,row"]
+
+
+def test_sdk_reads_grids_with_separators(tmp_path):
+    rows = [EASY[i:i + 9] for i in range(0, 81, 9)]
+    grid = []
+    for i, row in enumerate(rows):
+        grid.append(row[:3] + "|" + row[3:6] + "|" + row[6:])
+        if i in (2, 5):
+            grid.append("---+---+---")
+    path = tmp_path / "puzzles.sdk"
+    second = "\n".join(HARD[i:i + 9] for i in range(0, 81, 9))
+    path.write_text("#A an author\n[Puzzle]\n" + "\n".join(grid) + "\n\n" + second)
+    assert [format_puzzle(p) for p in read_puzzles(str(path))] == [EASY, HARD]
+
+
+def test_lines_skip_comments_and_bad_lines(tmp_path):
+    path = tmp_path / "puzzles.txt"
+    path.write_text("# a comment\n" + EASY + " rated 1.2\nnot a sudoku\n\n" + HARD + "\n")
+    skipped = []
+    assert [format_puzzle(p) for p in read_puzzles(str(path), skipped=skipped)] == [EASY, HARD]
+    assert skipped == ["not a sudoku"]
+    assert format_puzzle(load_puzzle(str(path), 1)) == HARD
+    with pytest.raises(IndexError):
+        load_puzzle(str(path), 2)